@@ -0,0 +1,687 @@
+"""Audio plumbing for the Gemini Live voice chat (see sample3.py).
+
+Run ``python audio_pipeline.py vad FILE`` to try the voice-activity gate
+on a recording (16-bit WAV, or raw mono int16 PCM with ``--rate``).
+"""
+import argparse
+import asyncio
+import threading
+import time
+import wave
+
+import numpy as np
+
+DROP_OLDEST = "drop-oldest"
+BLOCK = "block"
+
+
+class AudioRing:
+    """Fixed-capacity byte ring for PCM audio passed between threads.
+
+    The storage is one preallocated bytearray; writes copy into it and
+    readers copy out into their own buffers with ``read_into()``, so a
+    steady stream allocates nothing. When a write does not fit, ``policy``
+    decides:
+
+    * ``"drop-oldest"``: discard the oldest audio to make room (never
+      blocks, so the buffered delay stays bounded).
+    * ``"block"``: wait until a reader has made room (backpressure).
+
+    :param int capacity: Size in bytes (rounded down to whole frames).
+    :param str policy: ``"drop-oldest"`` or ``"block"``.
+    :param int frame_bytes: Bytes per sample frame; writes and reads keep
+                            to this alignment (2 for mono int16).
+    :param int rate: Sample rate, only used to report occupancy in ms.
+    """
+
+    POLICIES = (DROP_OLDEST, BLOCK)
+
+    def __init__(self, capacity, policy=DROP_OLDEST, frame_bytes=2, rate=None):
+        if policy not in self.POLICIES:
+            raise ValueError(f"policy must be one of {self.POLICIES}")
+        capacity -= capacity % frame_bytes
+        if capacity <= 0:
+            raise ValueError("capacity must hold at least one frame")
+        self.capacity = capacity
+        self.policy = policy
+        self.frame_bytes = frame_bytes
+        self.rate = rate
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.RLock())
+        self.reset_stats()
+
+    @classmethod
+    def for_duration(cls, seconds, rate, policy=DROP_OLDEST, frame_bytes=2):
+        """Ring holding ``seconds`` of audio at ``rate`` frames per second."""
+        return cls(int(seconds * rate) * frame_bytes, policy, frame_bytes, rate)
+
+    def reset_stats(self):
+        """Zero the throughput and drop counters (not the contents)."""
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self.bytes_dropped = 0  # audio discarded by drop-oldest
+        self.drops = 0  # writes that had to discard audio
+        self.peak = 0  # highest occupancy seen, in bytes
+        self.blocked_seconds = 0.0  # writers' time waiting for room
+
+    @property
+    def occupancy(self):
+        """Bytes currently buffered."""
+        return self._size
+
+    @property
+    def closed(self):
+        return self._closed
+
+    @property
+    def lock(self):
+        """The ring's reentrant lock, for callers whose own state must change
+        atomically with its contents. The ring's methods can be called while
+        holding it; ``wait()`` and a blocking ``write()`` release it while
+        they sleep."""
+        return self._cond
+
+    def write(self, data, timeout=None):
+        """Append ``data``; returns False if it was not written.
+
+        With the ``"block"`` policy this waits up to ``timeout`` seconds for
+        room (None = forever, 0 = don't wait) and writes all of ``data`` or
+        nothing. ``"drop-oldest"`` always writes.
+        """
+        data = memoryview(data).cast("B")
+        n = len(data)
+        if n % self.frame_bytes:
+            raise ValueError(f"write of {n} bytes is not whole {self.frame_bytes}-byte frames")
+        with self._cond:
+            if self._closed:
+                return False
+            if self.policy == BLOCK:
+                if n > self.capacity:
+                    raise ValueError(f"write of {n} bytes exceeds the ring's {self.capacity}")
+                if self.capacity - self._size < n:
+                    start = time.perf_counter()
+                    ready = self._cond.wait_for(
+                        lambda: self._closed or self.capacity - self._size >= n, timeout
+                    )
+                    self.blocked_seconds += time.perf_counter() - start
+                    if not ready or self._closed:
+                        return False
+            else:
+                if n > self.capacity:
+                    self.bytes_dropped += n - self.capacity
+                    data = data[n - self.capacity :]
+                    n = self.capacity
+                overflow = self._size + n - self.capacity
+                if overflow > 0:
+                    self._start = (self._start + overflow) % self.capacity
+                    self._size -= overflow
+                    self.bytes_dropped += overflow
+                    self.drops += 1
+
+            end = (self._start + self._size) % self.capacity
+            first = min(n, self.capacity - end)
+            self._view[end : end + first] = data[:first]
+            self._view[: n - first] = data[first:]
+            self._size += n
+            self.bytes_written += n
+            if self._size > self.peak:
+                self.peak = self._size
+            self._cond.notify_all()
+        return True
+
+    def read_into(self, buf):
+        """Move up to ``len(buf)`` bytes (whole frames) into ``buf``; returns the count."""
+        out = memoryview(buf).cast("B")
+        with self._cond:
+            n = min(len(out), self._size)
+            n -= n % self.frame_bytes
+            if not n:
+                return 0
+            first = min(n, self.capacity - self._start)
+            out[:first] = self._view[self._start : self._start + first]
+            out[first:n] = self._view[: n - first]
+            self._start = (self._start + n) % self.capacity
+            self._size -= n
+            self.bytes_read += n
+            self._cond.notify_all()
+        return n
+
+    def wait(self, min_bytes=1, timeout=None, until=None):
+        """Block until ``min_bytes`` are buffered (or the ring closes); False on timeout.
+
+        ``until``, if given, is checked as an extra wake-up condition whenever
+        the ring changes or wake() is called.
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._closed or self._size >= min_bytes or (until is not None and until()),
+                timeout,
+            )
+            return self._size >= min_bytes
+
+    def wake(self):
+        """Re-check waiting readers' ``until`` conditions."""
+        with self._cond:
+            self._cond.notify_all()
+
+    def clear(self):
+        with self._cond:
+            self._start = 0
+            self._size = 0
+            self._cond.notify_all()
+
+    def close(self):
+        """Wake every waiting reader and writer; later writes are refused."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def stats(self):
+        """Occupancy and drop counters as a dict."""
+        result = {
+            "capacity": self.capacity,
+            "policy": self.policy,
+            "occupancy": self._size,
+            "peak": self.peak,
+            "bytes_written": self.bytes_written,
+            "bytes_read": self.bytes_read,
+            "bytes_dropped": self.bytes_dropped,
+            "drops": self.drops,
+            "blocked_ms": self.blocked_seconds * 1000,
+        }
+        if self.rate:
+            ms_per_byte = 1000 / (self.rate * self.frame_bytes)
+            result["occupancy_ms"] = self._size * ms_per_byte
+            result["peak_ms"] = self.peak * ms_per_byte
+        return result
+
+
+class UplinkPacketizer:
+    """Coalesce mic audio from an AudioRing into larger uplink packets.
+
+    A packet goes out once ``packet_bytes`` are buffered, or once the
+    first audio in it has waited ``max_delay`` seconds, whichever comes
+    first. ``max_delay=0`` sends whatever is buffered as soon as it
+    arrives (one packet per mic chunk, like an unbatched uplink).
+
+    While a packet fills, the sender sleeps for the time the missing audio
+    needs to arrive instead of waking for every mic chunk. A packet whose
+    send() fails (or is cancelled) is kept and sent first by the next
+    run(), so a caller that reconnects and runs again loses no audio.
+
+    :param ring: AudioRing the mic callback writes into (with ``rate`` set).
+    :param ready: asyncio.Event the mic callback sets after each write.
+    :param int packet_bytes: Target packet size.
+    :param float max_delay: Longest time audio may wait for a packet to fill.
+    """
+
+    def __init__(self, ring, ready, packet_bytes, max_delay):
+        packet_bytes -= packet_bytes % ring.frame_bytes
+        if packet_bytes <= 0:
+            raise ValueError("packet_bytes must hold at least one frame")
+        if not ring.rate:
+            raise ValueError("UplinkPacketizer needs a ring with a sample rate")
+        self.ring = ring
+        self.ready = ready
+        self.packet_bytes = packet_bytes
+        self.max_delay = max_delay
+        self._byte_rate = ring.rate * ring.frame_bytes
+        self._packet = bytearray(packet_bytes)
+        self._view = memoryview(self._packet)
+        self._unsent = None
+        self.reset_stats()
+
+    @classmethod
+    def for_duration(cls, ring, ready, packet_seconds, max_delay):
+        return cls(ring, ready, int(packet_seconds * ring.rate) * ring.frame_bytes, max_delay)
+
+    def reset_stats(self):
+        self.packets = 0
+        self.bytes = 0
+        self.hold_sum = 0.0  # time from noticing audio to sending it
+        self.hold_max = 0.0
+        self.send_seconds = 0.0  # time spent awaiting send()
+        self._started = time.perf_counter()
+
+    async def run(self, send):
+        """Send packets with ``await send(data)`` until the ring is closed."""
+        ring = self.ring
+        if self._unsent is not None:
+            await self._send(send, self._unsent, time.perf_counter())
+        while True:
+            if not ring.occupancy:
+                if ring.closed:
+                    return
+                await self.ready.wait()
+                self.ready.clear()
+                continue
+
+            # Audio is waiting: hold it until the packet fills or max_delay runs out
+            noticed = time.perf_counter()
+            deadline = noticed + self.max_delay
+            while ring.occupancy < self.packet_bytes and not ring.closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                missing = (self.packet_bytes - ring.occupancy) / self._byte_rate
+                await asyncio.sleep(min(remaining, missing))
+
+            self.ready.clear()
+            n = ring.read_into(self._packet)
+            await self._send(send, bytes(self._view[:n]), noticed)
+
+    @property
+    def unsent_bytes(self):
+        """Bytes of a packet whose send() failed, waiting for the next run()."""
+        return len(self._unsent) if self._unsent is not None else 0
+
+    async def _send(self, send, data, noticed):
+        start = time.perf_counter()
+        try:
+            await send(data)
+        except BaseException:
+            self._unsent = data
+            raise
+        self._unsent = None
+        done = time.perf_counter()
+        self.packets += 1
+        self.bytes += len(data)
+        self.hold_sum += start - noticed
+        self.hold_max = max(self.hold_max, start - noticed)
+        self.send_seconds += done - start
+
+    def stats(self):
+        """Send rate, throughput and hold-time figures as a dict."""
+        elapsed = time.perf_counter() - self._started
+        packets = self.packets or 1
+        return {
+            "packets": self.packets,
+            "bytes": self.bytes,
+            "packets_per_s": self.packets / elapsed if elapsed > 0 else 0.0,
+            "bytes_per_s": self.bytes / elapsed if elapsed > 0 else 0.0,
+            "mean_packet_bytes": self.bytes / packets,
+            "hold_mean_ms": self.hold_sum / packets * 1000,
+            "hold_max_ms": self.hold_max * 1000,
+            "send_mean_ms": self.send_seconds / packets * 1000,
+        }
+
+
+class JitterBuffer:
+    """Adaptive playout buffer between bursty network audio and a sound device.
+
+    Audio pushed in is held until ``target`` seconds of it are buffered, then
+    handed out in fixed device-sized chunks by read_chunk(). The target
+    follows the measured arrival jitter (how late chunks arrive compared with
+    the audio already received), between ``min_delay`` and ``max_delay``, and
+    each underrun raises it by one device chunk. Call end_turn() when a
+    response is complete so its tail is played out at once; without it, a
+    buffer that runs dry only counts as an underrun if more audio follows
+    within ``max_delay``.
+
+    Time-to-first-audio is measured from the last mark_request() before a
+    response starts (or its first arrival, without one) to its first chunk
+    leaving read_chunk().
+
+    :param ring: AudioRing holding the audio (its policy applies to push()).
+    :param float target_delay: Playout delay with no jitter, in seconds.
+    :param int device_frames: Frames per device write.
+    """
+
+    IDLE, BUFFERING, PLAYING = "idle", "buffering", "playing"
+    JITTER_GAIN = 4  # target = target_delay + JITTER_GAIN * jitter
+
+    def __init__(self, ring, target_delay=0.06, min_delay=0.02, max_delay=0.3, device_frames=512):
+        if not ring.rate:
+            raise ValueError("JitterBuffer needs a ring with a sample rate")
+        self.ring = ring
+        # State changes happen under the ring's (reentrant) lock, so push() on
+        # the receiving side and read_chunk() on the playback thread see each
+        # other's writes, and the ring contents, as a whole
+        self._lock = ring.lock
+        self.target_delay = target_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self._byte_rate = ring.rate * ring.frame_bytes
+        self.device_bytes = device_frames * ring.frame_bytes
+        self.device_seconds = device_frames / ring.rate
+        self._chunk = bytearray(self.device_bytes)
+        self._view = memoryview(self._chunk)
+        self._silence = bytes(self.device_bytes)
+        self._state = self.IDLE
+        self._turn_ended = False
+        self._request_at = None
+        self._response_ref = None
+        self._response_arrival = None
+        self._last_arrival = None
+        self._last_duration = 0.0
+        self._dry_at = None
+        self.jitter = 0.0  # smoothed lateness of arrivals, seconds
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.responses = 0
+        self.underruns = 0
+        self.ttfa_last = None
+        self.ttfa_sum = 0.0
+        self.ttfa_max = 0.0
+        self.playout_delay_sum = 0.0
+
+    @property
+    def target(self):
+        """Current playout delay target in seconds."""
+        target = self.target_delay + self.JITTER_GAIN * self.jitter
+        return min(max(target, self.min_delay), self.max_delay)
+
+    def mark_request(self, at=None):
+        """Note when the user's request ended, the reference for time-to-first-audio."""
+        with self._lock:
+            self._request_at = time.perf_counter() if at is None else at
+
+    def push(self, data, timeout=None):
+        """Add received audio (see AudioRing.write); returns False if not written."""
+        with self._lock:
+            if not self.ring.write(data, timeout):
+                return False
+            now = time.perf_counter()
+            if self._dry_at is not None:
+                # Ran dry mid-response: that was an underrun, so plan for more jitter
+                self._dry_at = None
+                self.underruns += 1
+                self.jitter += self.device_seconds / self.JITTER_GAIN
+            if self._state == self.IDLE and self._response_arrival is None:
+                # First audio of a new response
+                self._response_arrival = now
+                self._response_ref = now if self._request_at is None else self._request_at
+                self._request_at = None
+                self._last_arrival = None
+            if self._last_arrival is not None:
+                # Lateness: gap beyond the audio the previous arrival carried
+                late = max(0.0, now - self._last_arrival - self._last_duration)
+                self.jitter += (late - self.jitter) / 16
+            self._last_arrival = now
+            self._last_duration = len(data) / self._byte_rate
+            self._turn_ended = False
+            return True
+
+    def end_turn(self):
+        """The current response is complete; play out whatever is left."""
+        with self._lock:
+            self._turn_ended = True
+            self.ring.wake()
+
+    def read_chunk(self, timeout=0.1):
+        """Return the next device-sized chunk of audio, or None if none is due.
+
+        Blocks up to ``timeout`` seconds while waiting for the playout delay.
+        """
+        with self._lock:
+            ring = self.ring
+            if self._state != self.PLAYING:
+                if self._dry_at is not None and time.perf_counter() - self._dry_at > self.max_delay:
+                    # Nothing followed: the response simply ended
+                    self._dry_at = None
+                    self._state = self.IDLE
+                target_bytes = int(self.target * self._byte_rate)
+                target_bytes -= target_bytes % ring.frame_bytes
+                ring.wait(max(target_bytes, ring.frame_bytes), timeout, until=lambda: self._turn_ended)
+                if ring.occupancy < target_bytes and not (ring.occupancy and self._stalled()):
+                    return None
+                self._start_playing()
+            elif ring.occupancy < self.device_bytes:
+                # The device still holds about a chunk, so wait that long at most
+                ring.wait(self.device_bytes, self.device_seconds, until=lambda: self._turn_ended)
+
+            n = ring.read_into(self._chunk)
+            if n < self.device_bytes:
+                self._view[n:] = self._silence[: self.device_bytes - n]
+                if self._turn_ended:
+                    self._state = self.IDLE
+                    self._turn_ended = False
+                else:
+                    self._dry_at = time.perf_counter()
+                    self._state = self.BUFFERING
+                if not n:
+                    return None
+            return bytes(self._view)
+
+    def _stalled(self):
+        # The response ended, or nothing has arrived for longer than max_delay
+        if self._turn_ended:
+            return True
+        last = self._last_arrival
+        return last is not None and time.perf_counter() - last > self.max_delay
+
+    def _start_playing(self):
+        now = time.perf_counter()
+        if self._response_arrival is not None:
+            ttfa = now - self._response_ref
+            self.responses += 1
+            self.ttfa_last = ttfa
+            self.ttfa_sum += ttfa
+            self.ttfa_max = max(self.ttfa_max, ttfa)
+            self.playout_delay_sum += now - self._response_arrival
+            self._response_arrival = None
+        self._state = self.PLAYING
+
+    def stats(self):
+        """Playout target, jitter, underruns and time-to-first-audio as a dict."""
+        with self._lock:
+            responses = self.responses or 1
+            return {
+                "state": self._state,
+                "target_ms": self.target * 1000,
+                "jitter_ms": self.jitter * 1000,
+                "buffered_ms": self.ring.occupancy / self._byte_rate * 1000,
+                "responses": self.responses,
+                "underruns": self.underruns,
+                "ttfa_last_ms": None if self.ttfa_last is None else self.ttfa_last * 1000,
+                "ttfa_mean_ms": self.ttfa_sum / responses * 1000,
+                "ttfa_max_ms": self.ttfa_max * 1000,
+                "playout_delay_mean_ms": self.playout_delay_sum / responses * 1000,
+            }
+
+
+class VoiceGate:
+    """Voice-activity gate: pass speech from a mic stream and drop the silence.
+
+    Audio is judged in ``frame_ms`` frames on two features, computed for all
+    frames of a chunk at once: energy (dBFS) and zero-crossing rate. A frame
+    is speech when its energy is ``margin_db`` above the tracked noise floor,
+    or half that with a zero-crossing rate above ``zcr_unvoiced`` (to catch
+    quiet fricatives like "s" and "f"). Speech frames are passed to ``emit``
+    together with the ``preroll_ms`` of audio before the onset, so word
+    starts are not clipped, and the gate stays open for ``hangover_ms``
+    after the last speech frame.
+
+    The noise floor starts at ``initial_floor_db`` (so speech right at the
+    start still opens the gate) and is tracked on non-speech frames only:
+    it follows quieter frames down at once, but not below ``min_floor_db``
+    (default ``initial_floor_db - 10``, so digital silence cannot make room
+    noise look like speech), and otherwise creeps up by ``floor_rise_db``
+    per second, so a slowly louder background is followed. Speech never
+    moves it, so long speech is not cut off.
+
+    :param emit: Called with each passed block of PCM bytes.
+    :param on_speech_start: Called (no arguments) when the gate opens.
+    :param on_speech_end: Called when the gate closes after the hangover.
+    """
+
+    def __init__(self, emit, rate=16000, frame_ms=20, margin_db=12.0, zcr_unvoiced=0.25,
+                 preroll_ms=200, hangover_ms=300, initial_floor_db=-50.0, floor_rise_db=3.0,
+                 min_floor_db=None, on_speech_start=None, on_speech_end=None):
+        self.emit = emit
+        self.rate = rate
+        self.frame_samples = int(rate * frame_ms / 1000)
+        self.margin_db = margin_db
+        self.zcr_unvoiced = zcr_unvoiced
+        self.hangover_frames = max(1, round(hangover_ms / frame_ms))
+        self._floor_rise = floor_rise_db * frame_ms / 1000
+        self.min_floor_db = initial_floor_db - 10.0 if min_floor_db is None else min_floor_db
+        self.on_speech_start = on_speech_start
+        self.on_speech_end = on_speech_end
+        self._preroll = AudioRing.for_duration(preroll_ms / 1000, rate)
+        self._preroll_out = bytearray(self._preroll.capacity)
+        self._work = np.zeros(self.frame_samples * 8, dtype=np.int16)
+        self._carry = 0  # samples of an unfinished frame at the start of _work
+        self.active = False
+        self._hang = 0
+        self.noise_floor_db = initial_floor_db
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.frames = 0
+        self.speech_frames = 0
+        self.segments = 0  # times the gate opened
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    @property
+    def suppressed_fraction(self):
+        """Share of the input audio that was not passed on."""
+        return 1 - self.bytes_out / self.bytes_in if self.bytes_in else 0.0
+
+    def process(self, pcm):
+        """Feed a chunk of mono int16 PCM; returns the number of bytes emitted."""
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        needed = self._carry + len(samples)
+        if needed > len(self._work):
+            work = np.zeros(needed, dtype=np.int16)
+            work[: self._carry] = self._work[: self._carry]
+            self._work = work
+        self._work[self._carry : needed] = samples
+
+        size = self.frame_samples
+        count = needed // size
+        emitted = 0
+        if count:
+            frames = self._work[: count * size].reshape(count, size)
+            scaled = frames / 32768.0
+            energy_db = 10 * np.log10(np.mean(scaled * scaled, axis=1) + 1e-10)
+            zcr = np.mean(np.signbit(frames[:, 1:]) != np.signbit(frames[:, :-1]), axis=1)
+            raw = memoryview(self._work).cast("B")
+            for i in range(count):
+                frame = raw[i * size * 2 : (i + 1) * size * 2]
+                emitted += self._step(frame, energy_db[i], zcr[i])
+            self.frames += count
+            self.bytes_in += count * size * 2
+            del raw
+
+        # Keep the unfinished frame for the next chunk
+        self._carry = needed - count * size
+        self._work[: self._carry] = self._work[count * size : needed]
+        return emitted
+
+    def _step(self, frame, energy_db, zcr):
+        threshold = self.noise_floor_db + self.margin_db
+        speech = energy_db > threshold or (
+            energy_db > threshold - self.margin_db / 2 and zcr > self.zcr_unvoiced
+        )
+        if speech:
+            self.speech_frames += 1
+            self._hang = self.hangover_frames
+            emitted = 0
+            if not self.active:
+                self.active = True
+                self.segments += 1
+                if self.on_speech_start is not None:
+                    self.on_speech_start()
+                n = self._preroll.read_into(self._preroll_out)
+                if n:
+                    self.emit(memoryview(self._preroll_out)[:n])
+                    emitted += n
+            self.emit(frame)
+            self.bytes_out += emitted + len(frame)
+            return emitted + len(frame)
+
+        # Only background frames move the noise floor
+        if energy_db < self.noise_floor_db:
+            self.noise_floor_db = max(energy_db, self.min_floor_db)
+        else:
+            self.noise_floor_db += self._floor_rise
+
+        if self.active and self._hang > 0:
+            self._hang -= 1
+            self.emit(frame)
+            self.bytes_out += len(frame)
+            return len(frame)
+
+        if self.active:
+            self.active = False
+            if self.on_speech_end is not None:
+                self.on_speech_end()
+        self._preroll.write(frame)
+        return 0
+
+    def stats(self):
+        """Frame counts, segments, suppression and noise floor as a dict."""
+        return {
+            "frames": self.frames,
+            "speech_frames": self.speech_frames,
+            "segments": self.segments,
+            "suppressed_fraction": self.suppressed_fraction,
+            "noise_floor_db": self.noise_floor_db,
+            "active": self.active,
+        }
+
+
+def _read_pcm(path, rate):
+    """Mono int16 samples and sample rate of a WAV file or raw PCM file."""
+    if path.lower().endswith(".wav"):
+        with wave.open(path, "rb") as wav:
+            if wav.getsampwidth() != 2:
+                raise ValueError(f"{path} is not 16-bit PCM")
+            channels = wav.getnchannels()
+            pcm = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+            return np.ascontiguousarray(pcm[::channels]), wav.getframerate()
+    with open(path, "rb") as f:
+        return np.frombuffer(f.read(), dtype=np.int16), rate
+
+
+def _vad_main(args):
+    samples, rate = _read_pcm(args.path, args.rate)
+    out = bytearray()
+    position = [0]
+    segments = []
+    gate = VoiceGate(
+        out.extend, rate=rate, margin_db=args.margin, preroll_ms=args.preroll, hangover_ms=args.hangover,
+        on_speech_start=lambda: segments.append([position[0] / rate, None]),
+        on_speech_end=lambda: segments[-1].__setitem__(1, position[0] / rate),
+    )
+    start = time.perf_counter()
+    for offset in range(0, len(samples), args.chunk):
+        position[0] = offset
+        gate.process(samples[offset : offset + args.chunk].tobytes())
+    elapsed = time.perf_counter() - start
+
+    duration = len(samples) / rate
+    for begin, end in segments:
+        print(f"speech {begin:7.2f}s - " + ("end" if end is None else f"{end:.2f}s"))
+    s = gate.stats()
+    print(f"{duration:.1f}s of audio, {s['segments']} segments, "
+          f"{s['suppressed_fraction']:.0%} suppressed, noise floor {s['noise_floor_db']:.1f} dBFS, "
+          f"{elapsed / duration * 1000:.2f} ms CPU per second of audio")
+    if args.output:
+        with wave.open(args.output, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(rate)
+            wav.writeframes(out)
+        print(f"Gated audio written to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audio pipeline tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    vad = commands.add_parser("vad", help="run the voice-activity gate over a recording")
+    vad.add_argument("path", help="16-bit WAV file, or raw mono int16 PCM")
+    vad.add_argument("--rate", type=int, default=16000, help="sample rate of raw PCM input")
+    vad.add_argument("--chunk", type=int, default=512, help="samples per simulated mic callback")
+    vad.add_argument("--margin", type=float, default=12.0, help="dB above the noise floor")
+    vad.add_argument("--preroll", type=float, default=200, help="pre-roll in ms")
+    vad.add_argument("--hangover", type=float, default=300, help="hangover in ms")
+    vad.add_argument("--output", help="write the gated audio to this WAV file")
+    _vad_main(parser.parse_args())
@@ -0,0 +1,302 @@
+"""Audio-reactive LED animation fed from a 16-bit PCM stream.
+
+Audio comes in as raw chunks through a tap: AudioHandler's microphone
+callback in sample3.py, or WavSource for testing. BandAnalyzer keeps a
+sliding window of the newest samples and turns it into per-band energies
+with one NumPy FFT; AudioReactive draws those onto a Pi5Pixelbuf, and
+ReactiveLeds renders one frame per audio chunk on its own thread (or
+RingReactive in a separate process, see frame_ring.py).
+
+End-to-end (mic-to-photon) latency of a frame is counted as the chunk
+length, since the oldest sample in a chunk waits that long before the
+callback delivers it, plus the time from the callback to the frame's
+write returning. That assumes the backend returns once the frame is on
+the wire, which holds for ``neopixel_write`` and the ``"wire"`` backend.
+
+Try it without hardware:
+
+    python audio_reactive.py song.wav --backend wire
+"""
+import argparse
+import threading
+import time
+import wave
+
+import numpy as np
+from adafruit_led_animation.animation import Animation
+from adafruit_led_animation.color import BLUE, RED
+
+from frame_stats import RollingHistogram
+from led_backends import backend_from_spec, spec_needs_pin
+from neon_animations import write_rgb
+from pi5_pixelbuf import Pi5Pixelbuf
+
+LATENCY_BUDGET = 0.025  # seconds, mic to photon
+DEFAULT_CHUNK = 128  # samples per tap call: 8 ms at 16 kHz
+
+
+class BandAnalyzer:
+    """Band energies of the newest ``window`` samples of a PCM stream.
+
+    ``push()`` is the tap: it is cheap enough to call from an audio
+    callback. ``levels()`` does the FFT and is called from the render side.
+    Levels are in dB relative to a slowly decaying per-band peak and
+    mapped from ``-dynamic_range_db..0`` to 0..1, so quiet and loud
+    sources both fill the range.
+
+    :param int rate: Sample rate in Hz.
+    :param int window: FFT length in samples (the sliding window).
+    :param int bands: Number of log-spaced frequency bands.
+    """
+
+    def __init__(self, rate=16000, window=512, bands=8, fmin=60.0, fmax=None,
+                 dynamic_range_db=40.0, peak_decay=0.995):
+        self.rate = rate
+        self.window = window
+        self.bands = bands
+        self.dynamic_range_db = dynamic_range_db
+        self.peak_decay = peak_decay
+        self.chunk_seconds = 0.0  # length of the newest chunk
+        self.captured_at = None  # perf_counter() when the newest chunk arrived
+        self._samples = np.zeros(window, dtype=np.float32)
+        self._taper = np.hanning(window).astype(np.float32)
+        self._peak = np.full(bands, 1e-9)
+        self._lock = threading.Lock()
+        self._fresh = threading.Event()
+
+        # FFT bin -> band index, with bins outside fmin..fmax dropped
+        edges = np.geomspace(fmin, fmax or rate / 2, bands + 1)
+        band_of_bin = np.searchsorted(edges, np.fft.rfftfreq(window, 1 / rate), side="right") - 1
+        self._in_range = (band_of_bin >= 0) & (band_of_bin < bands)
+        self._band_of_bin = band_of_bin[self._in_range]
+
+    def push(self, pcm, captured_at=None):
+        """Append a chunk of mono int16 PCM bytes (e.g. a PyAudio callback's in_data)."""
+        samples = np.frombuffer(pcm, dtype=np.int16)[-self.window :]
+        n = len(samples)
+        with self._lock:
+            self._samples[:-n] = self._samples[n:]
+            np.multiply(samples, 1 / 32768, out=self._samples[-n:], casting="unsafe")
+            self.chunk_seconds = len(pcm) / 2 / self.rate
+            self.captured_at = time.perf_counter() if captured_at is None else captured_at
+        self._fresh.set()
+
+    def wait(self, timeout=None):
+        """Block until a chunk arrives after the last wait(); False on timeout."""
+        if not self._fresh.wait(timeout):
+            return False
+        self._fresh.clear()
+        return True
+
+    def levels(self):
+        """Return (band levels 0..1, captured_at of the audio they describe)."""
+        with self._lock:
+            windowed = self._samples * self._taper
+            captured_at = self.captured_at
+        power = np.abs(np.fft.rfft(windowed)) ** 2
+        energy = np.bincount(self._band_of_bin, weights=power[self._in_range], minlength=self.bands)
+        self._peak = np.maximum(energy, self._peak * self.peak_decay)
+        db = 10 * np.log10(np.maximum(energy, 1e-12) / self._peak)
+        return np.clip(1 + db / self.dynamic_range_db, 0.0, 1.0), captured_at
+
+
+class AudioReactive(Animation):
+    """Spectrum bars, mirrored from the middle of the strip outwards.
+
+    Low bands sit in the centre in ``color_low``, shading to ``color_high``
+    at the ends; each band's brightness follows its level. Every show()
+    with new audio records its mic-to-photon latency in ``latency``.
+
+    :param analyzer: BandAnalyzer to read levels from.
+    """
+
+    def __init__(self, pixel_object, speed, analyzer, color_low=RED, color_high=BLUE, name=None):
+        self.analyzer = analyzer
+        self.latency = RollingHistogram()
+        self.over_budget = 0  # frames later than LATENCY_BUDGET
+        self._captured_at = None
+        self._last_shown = None
+        super().__init__(pixel_object, speed, color_low, name=name)
+
+        n = len(pixel_object)
+        bands = analyzer.bands
+        distance = np.abs(np.arange(n) - (n - 1) / 2) / max((n - 1) / 2, 1)
+        self._band_of_pixel = np.minimum((distance * bands).astype(np.intp), bands - 1)
+        mix = np.linspace(0.0, 1.0, bands)[:, np.newaxis]
+        self._band_colors = np.array(color_low, dtype=np.float32) * (1 - mix) + \
+            np.array(color_high, dtype=np.float32) * mix
+
+    def draw(self):
+        levels, self._captured_at = self.analyzer.levels()
+        colors = (self._band_colors * levels[:, np.newaxis])[self._band_of_pixel]
+        frame = getattr(self.pixel_object, "frame", None)
+        if frame is not None:
+            write_rgb(frame, colors)
+        else:
+            self.pixel_object[:] = colors.astype(np.int64).tolist()
+
+    def show(self):
+        super().show()
+        captured_at = self._captured_at
+        if captured_at is not None and captured_at != self._last_shown:
+            self._last_shown = captured_at
+            latency = self.analyzer.chunk_seconds + time.perf_counter() - captured_at
+            self.latency.add(latency)
+            if latency > LATENCY_BUDGET:
+                self.over_budget += 1
+
+    def latency_report(self):
+        """One-line mic-to-photon summary against LATENCY_BUDGET."""
+        t = self.latency.summary()
+        return (
+            f"mic-to-photon over {t['count']} frames: p50 {t['p50']:.1f}  p99 {t['p99']:.1f}  "
+            f"max {t['max']:.1f} ms (chunk {self.analyzer.chunk_seconds * 1000:.1f} ms), "
+            f"{self.over_budget} over the {LATENCY_BUDGET * 1000:.0f} ms budget"
+        )
+
+
+class ReactiveLeds:
+    """Render an AudioReactive frame for every chunk the analyzer receives.
+
+    Runs on its own thread so the audio callback only pays for the push;
+    if frames fall behind, chunks are folded into the next frame rather
+    than queued.
+    """
+
+    def __init__(self, animation):
+        self.animation = animation
+        self.analyzer = animation.analyzer
+        self._running = False
+        self._thread = None
+
+    @classmethod
+    def for_strip(cls, pin, size, rate=16000, byteorder="BGR", brightness=0.6, backend=None, **kwargs):
+        """Build the analyzer, a Pi5Pixelbuf and the animation for one strip."""
+        pixels = Pi5Pixelbuf(pin, size, auto_write=False, byteorder=byteorder,
+                             brightness=brightness, backend=backend)
+        return cls(AudioReactive(pixels, 0, BandAnalyzer(rate=rate, **kwargs)))
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="reactive-leds", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop rendering, clear the strip and close it."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        pixels = self.animation.pixel_object
+        pixels.fill(0)
+        pixels.show()
+        pixels.close()
+
+    def _run(self):
+        while self._running:
+            if self.analyzer.wait(timeout=0.1):
+                self.animation.animate()
+
+    def report(self):
+        return self.animation.latency_report()
+
+
+class RingReactive:
+    """AudioReactive fed with mic chunks from a frame_ring.FrameRing.
+
+    The render side of frame_ring.OutOfProcessRenderer: each animate()
+    pushes the chunks written since the last call into the analyzer with
+    their capture times and draws a frame, or returns False when no new
+    audio has arrived. Drive it faster than chunks arrive. Its latency
+    report runs to the frame reaching the ring; the output process reports
+    the time from there to the wire.
+    """
+
+    def __init__(self, pixels, feed, rate=16000, **kwargs):
+        self.animation = AudioReactive(pixels, 0, BandAnalyzer(rate=rate, **kwargs))
+        self.feed = feed
+        self._chunk = np.empty(feed.frame_bytes, dtype=np.uint8)
+
+    def animate(self):
+        if not self.feed.drain(self._chunk, self.animation.analyzer.push):
+            return False
+        return self.animation.animate()
+
+    def latency_report(self):
+        return self.animation.latency_report()
+
+
+class WavSource:
+    """Feed a 16-bit WAV file to a tap in fixed chunks, paced like a live mic.
+
+    Stereo files are reduced to their first channel.
+
+    :param tap: Called with each chunk of mono int16 PCM bytes.
+    :param int chunk: Samples per call.
+    :param bool realtime: Pace chunks at the file's sample rate (False = as
+                          fast as the tap accepts them).
+    """
+
+    def __init__(self, path, tap, chunk=DEFAULT_CHUNK, realtime=True):
+        self.path = path
+        self.tap = tap
+        self.chunk = chunk
+        self.realtime = realtime
+        with wave.open(path, "rb") as wav:
+            if wav.getsampwidth() != 2:
+                raise ValueError(f"{path} is not 16-bit PCM")
+            self.rate = wav.getframerate()
+            channels = wav.getnchannels()
+            pcm = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        self._pcm = np.ascontiguousarray(pcm[::channels])
+
+    @property
+    def duration(self):
+        return len(self._pcm) / self.rate
+
+    def run(self):
+        period = self.chunk / self.rate
+        deadline = time.monotonic()
+        for start in range(0, len(self._pcm) - self.chunk + 1, self.chunk):
+            if self.realtime:
+                # A mic delivers a chunk once its last sample is captured
+                deadline += period
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            self.tap(self._pcm[start : start + self.chunk].tobytes())
+
+
+def _main():
+    parser = argparse.ArgumentParser(description="Play a WAV file through the audio-reactive LEDs")
+    parser.add_argument("path", help="16-bit PCM WAV file")
+    parser.add_argument("--pixels", type=int, default=96)
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK, help="samples per audio chunk")
+    parser.add_argument("--backend", default="wire",
+                        help="LED backend spec (see led_backends.backend_from_spec), default wire")
+    parser.add_argument("--pin", default="D18", help="board pin name for the neopixel backend")
+    args = parser.parse_args()
+
+    pin = None
+    if spec_needs_pin(args.backend):
+        import board
+
+        pin = getattr(board, args.pin)
+    source = WavSource(args.path, None, chunk=args.chunk)
+    leds = ReactiveLeds.for_strip(pin, args.pixels, rate=source.rate,
+                                  backend=backend_from_spec(args.backend, pin))
+    source.tap = leds.analyzer.push
+    print(f"Playing {args.path} ({source.duration:.1f}s at {source.rate} Hz) "
+          f"on {args.pixels} pixels via {args.backend}...")
+    leds.start()
+    try:
+        source.run()
+    except KeyboardInterrupt:
+        print("\nInterrupted by user.")
+    finally:
+        leds.stop()
+        print(leds.report())
+
+
+if __name__ == "__main__":
+    _main()
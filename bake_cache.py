@@ -0,0 +1,234 @@
+"""Bake deterministic animations into frame files and play them back.
+
+An animation whose frames depend only on how many times it has drawn (like
+LiquidNeon) can be rendered once into a frame file and then streamed from a
+memory map on every later run. The files live in a size-bounded cache
+keyed by animation class, parameters, pixel count and byteorder; the least
+recently used bakes are evicted first.
+
+Frames are stored unscaled in wire byteorder (brightness and gamma are
+still applied at show time), using the FrameRecorder file format, so a bake
+can also be played with ``python led_backends.py replay FILE``.
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+from adafruit_led_animation.animation import Animation
+
+from led_backends import FrameRecorder, FrameReplayer
+from pi5_pixelbuf import Pi5Pixelbuf
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "led-samples", "bakes"
+)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+BAKE_FORMAT = 2  # bump to invalidate every existing bake
+
+
+class _TimedFrames:
+    """Backend that records one frame per animation step at its speed."""
+
+    def __init__(self, recorder, period_ns):
+        self._recorder = recorder
+        self._period_ns = period_ns
+        self.frames = 0
+
+    def write(self, buf):
+        self._recorder.write(buf, timestamp_ns=self.frames * self._period_ns)
+        self.frames += 1
+
+    def close(self):
+        self._recorder.close()
+
+
+def bake(path, animation_class, params, pixel_count, byteorder, frames):
+    """Render ``frames`` steps of ``animation_class(pixels, **params)`` to ``path``."""
+    sink = _TimedFrames(FrameRecorder(path, capacity=frames), int(params.get("speed", 0) * 1e9))
+    pixels = Pi5Pixelbuf(None, pixel_count, byteorder=byteorder, brightness=1.0,
+                         skip_duplicates=False, backend=sink)
+    animation = animation_class(pixels, **params)
+    try:
+        for _ in range(frames):
+            # One frame per step, even for animations that show() mid-draw
+            with pixels.batch():
+                animation.draw()
+                animation.after_draw()
+                pixels.show()
+    finally:
+        pixels.close()
+
+
+class BakeCache:
+    """Directory of baked frame files, bounded to ``max_bytes`` with LRU eviction.
+
+    Use is tracked through file modification times, so the order survives
+    restarts. Bakes opened with ``open()`` share one FrameReplayer per file,
+    which stays mapped until the entry is evicted or the cache is closed;
+    entries still in use are never evicted.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._replayers = {}
+        self._users = {}
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(animation_class, params, pixel_count, byteorder, frames):
+        """Stable hash of everything that determines a bake's contents."""
+        description = {
+            "format": BAKE_FORMAT,
+            "class": f"{animation_class.__module__}.{animation_class.__qualname__}",
+            "params": params,
+            "pixels": pixel_count,
+            "byteorder": byteorder,
+            "frames": frames,
+        }
+        encoded = json.dumps(description, sort_keys=True, default=repr).encode()
+        return hashlib.sha1(encoded).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".ledrec")
+
+    def get(self, animation_class, params, pixel_count, byteorder, frames):
+        """Return the path of the bake, rendering it first on a cache miss."""
+        path = self.path(self.key(animation_class, params, pixel_count, byteorder, frames))
+        if os.path.exists(path):
+            os.utime(path)  # mark as most recently used
+            return path
+
+        # Bake to a temporary file so a crash never leaves a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            bake(tmp_path, animation_class, params, pixel_count, byteorder, frames)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.evict(keep=path)
+        return path
+
+    def open(self, path):
+        """Return the shared FrameReplayer for a bake; ``release()`` it when done."""
+        replayer = self._replayers.get(path)
+        if replayer is None:
+            replayer = self._replayers[path] = FrameReplayer(path)
+        self._users[path] = self._users.get(path, 0) + 1
+        return replayer
+
+    def release(self, path):
+        """Stop using a bake from ``open()``; it stays mapped until evicted."""
+        self._users[path] -= 1
+
+    def close(self):
+        """Unmap every opened bake."""
+        for path in list(self._replayers):
+            self._forget(path)
+
+    def size(self):
+        """Total bytes of baked files in the cache."""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, keep=None):
+        """Delete least recently used bakes until the cache fits max_bytes."""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep or self._users.get(path):
+                continue
+            self._forget(path)
+            os.unlink(path)
+            total -= size
+
+    def _forget(self, path):
+        replayer = self._replayers.pop(path, None)
+        self._users.pop(path, None)
+        if replayer is not None:
+            replayer.close()
+
+    def _entries(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(".ledrec"):
+                path = os.path.join(self.directory, name)
+                stat = os.stat(path)
+                yield path, stat.st_size, stat.st_mtime
+
+
+_default_cache = None
+
+
+def default_cache():
+    """The BakeCache in DEFAULT_CACHE_DIR shared by every caller that names none."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = BakeCache()
+    return _default_cache
+
+
+class BakedAnimation(Animation):
+    """Loop a baked frame file on a Pi5Pixelbuf.
+
+    Each step sends the next frame straight from the memory map into the
+    strip's transmit buffer with ``show_wire()``; nothing is rendered.
+    Call ``close()`` (or use it as a context manager) to unmap the file.
+
+    :param pixel_object: Pi5Pixelbuf with the byteorder the file was baked for.
+    :param str path: Baked frame file (see BakeCache.get()).
+    :param BakeCache cache: Cache to share the file's mapping through, if any.
+    """
+
+    on_cycle_complete_supported = True
+
+    def __init__(self, pixel_object, speed, path, name=None, cache=None):
+        self._path = path
+        self._cache = cache
+        self._frames = FrameReplayer(path) if cache is None else cache.open(path)
+        if self._frames.frame_bytes != len(pixel_object) * pixel_object.bpp:
+            self.close()
+            raise ValueError(f"{path} does not match a {len(pixel_object)}-pixel strip")
+        self._index = -1
+        super().__init__(pixel_object, speed, (0, 0, 0), name=name)
+
+    @classmethod
+    def cached(cls, pixel_object, animation_class, frames, cache=None, name=None, **params):
+        """Bake ``animation_class(pixels, **params)`` (once) and return its playback.
+
+        ``params`` must include ``speed``; playback runs at the same speed.
+        Without ``cache``, the shared default_cache() is used.
+        """
+        cache = default_cache() if cache is None else cache
+        path = cache.get(animation_class, params, len(pixel_object), pixel_object.byteorder, frames)
+        return cls(pixel_object, params["speed"], path, name=name, cache=cache)
+
+    def draw(self):
+        self._index += 1
+        if self._index == len(self._frames):
+            self._index = 0
+            self.cycle_complete = True
+
+    def show(self):
+        self.pixel_object.show_wire(self._frames.frame(max(self._index, 0))[1])
+
+    def reset(self):
+        self._index = -1
+
+    def close(self):
+        if self._frames is None:
+            return
+        if self._cache is None:
+            self._frames.close()
+        else:
+            self._cache.release(self._path)
+        self._frames = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
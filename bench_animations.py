@@ -0,0 +1,215 @@
+"""Headless benchmark of the LED animations across strip sizes.
+
+Runs each animation against a Pi5Pixelbuf with a simulated backend (no
+hardware needed) and reports, per frame:
+
+* render_ms: time in the animation's draw()/after_draw()
+* convert_ms: brightness/byteorder conversion in show()
+* transmit_ms: time in the backend's write()
+* alloc_kib: peak memory allocated while the frame ran (tracemalloc)
+* fps: frames per second the render + convert + transmit path sustains
+* wire_fps: the same, capped by the WS2812 wire time for that many pixels
+
+Results are written as JSON so two revisions can be compared:
+
+    python bench_animations.py --output before.json
+    python bench_animations.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+
+from adafruit_led_animation.animation.comet import Comet
+from adafruit_led_animation.animation.sparkle import Sparkle
+from adafruit_led_animation.color import RED, BLUE, PURPLE, TEAL, JADE, WHITE
+from adafruit_led_animation.helper import PixelSubset
+
+from led_backends import NullSink, wire_seconds
+from neon_animations import LiquidNeon, CyberGlitch, BatchedGroup
+from pi5_pixelbuf import Pi5Pixelbuf
+
+DEFAULT_SIZES = (96, 300, 1000, 3000, 10000)
+BYTEORDER = "BGR"
+BRIGHTNESS = 0.6
+
+
+class _TimedSink(NullSink):
+    def __init__(self):
+        super().__init__()
+        self.seconds = 0.0
+
+    def write(self, buf):
+        start = time.perf_counter()
+        super().write(buf)
+        self.seconds += time.perf_counter() - start
+
+
+class _TimedPixelbuf(Pi5Pixelbuf):
+    """Pi5Pixelbuf that accumulates the time spent sending frames."""
+
+    def __init__(self, size):
+        self.send_seconds = 0.0
+        super().__init__(None, size, byteorder=BYTEORDER, brightness=BRIGHTNESS,
+                         skip_duplicates=False, backend=_TimedSink())
+
+    def _send_frame(self, wire_frame=None):
+        start = time.perf_counter()
+        try:
+            return super()._send_frame(wire_frame)
+        finally:
+            self.send_seconds += time.perf_counter() - start
+
+
+# Builders mirror the instances in sample2.py, with speed 0 so every
+# animate() call draws a frame.
+def _liquid(pixels):
+    return LiquidNeon(pixels, speed=0, color_a=PURPLE, color_b=TEAL)
+
+
+def _glitch(pixels):
+    return CyberGlitch(pixels, speed=0, color=JADE, seed=0)
+
+
+def _comet(pixels):
+    return Comet(pixels, speed=0, color=RED, tail_length=15, bounce=True)
+
+
+def _sparkle(pixels):
+    return Sparkle(pixels, speed=0, color=WHITE, num_sparkles=20)
+
+
+def _collider(pixels):
+    half_point = len(pixels) // 2
+    left = Comet(PixelSubset(pixels, 0, half_point), speed=0, color=RED, tail_length=15, bounce=True)
+    right = Comet(PixelSubset(pixels, half_point, len(pixels)), speed=0, color=BLUE,
+                  tail_length=15, bounce=True)
+    return BatchedGroup(pixels, left, right)
+
+
+ANIMATIONS = {
+    "LiquidNeon": _liquid,
+    "CyberGlitch": _glitch,
+    "Comet": _comet,
+    "Sparkle": _sparkle,
+    "collider": _collider,
+}
+
+
+def bench_case(name, size, frames, warmup=10, alloc_frames=20):
+    """Benchmark one animation on one strip size; returns a result dict."""
+    pixels = _TimedPixelbuf(size)
+    animation = ANIMATIONS[name](pixels)
+    for _ in range(warmup):
+        animation.animate()
+
+    pixels.send_seconds = 0.0
+    pixels.backend.seconds = 0.0
+    start = time.perf_counter()
+    for _ in range(frames):
+        animation.animate()
+    total = time.perf_counter() - start
+    send = pixels.send_seconds
+    transmit = pixels.backend.seconds
+
+    # Allocation pass, separate so tracemalloc's overhead stays out of the timings
+    tracemalloc.start()
+    peaks = []
+    for _ in range(alloc_frames):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        animation.animate()
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+
+    frame_seconds = total / frames
+    wire = wire_seconds(len(pixels) * pixels.bpp)
+    return {
+        "animation": name,
+        "pixels": size,
+        "frames": frames,
+        "render_ms": (total - send) / frames * 1000,
+        "convert_ms": (send - transmit) / frames * 1000,
+        "transmit_ms": transmit / frames * 1000,
+        "frame_ms": frame_seconds * 1000,
+        "alloc_kib": float(np.median(peaks)) / 1024,
+        "fps": 1.0 / frame_seconds,
+        "wire_ms": wire * 1000,
+        "wire_fps": 1.0 / max(frame_seconds, wire),
+    }
+
+
+def _revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_row(result, baseline=None):
+    line = (
+        f"{result['animation']:<12} {result['pixels']:>6} "
+        f"{result['render_ms']:>9.3f} {result['convert_ms']:>9.3f} {result['transmit_ms']:>9.3f} "
+        f"{result['alloc_kib']:>9.1f} {result['fps']:>9.0f} {result['wire_fps']:>8.0f}"
+    )
+    if baseline is not None:
+        change = (result["frame_ms"] / baseline["frame_ms"] - 1) * 100
+        line += f" {change:>+7.1f}%"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LED animations headless")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated pixel counts")
+    parser.add_argument("--animations", default=",".join(ANIMATIONS),
+                        help="comma-separated subset of: " + ", ".join(ANIMATIONS))
+    parser.add_argument("--frames", type=int, default=200, help="timed frames per case")
+    parser.add_argument("--output", default="bench_results.json", help="JSON results file")
+    parser.add_argument("--compare", help="earlier results file to compare frame times against")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    names = args.animations.split(",")
+    for name in names:
+        if name not in ANIMATIONS:
+            parser.error(f"unknown animation {name!r}")
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            for result in json.load(f)["results"]:
+                baseline[(result["animation"], result["pixels"])] = result
+
+    print(f"{'animation':<12} {'pixels':>6} {'render_ms':>9} {'conv_ms':>9} {'xmit_ms':>9} "
+          f"{'alloc_kib':>9} {'fps':>9} {'wire_fps':>8}" + (" vs base" if baseline else ""))
+    results = []
+    for name in names:
+        for size in sizes:
+            result = bench_case(name, size, args.frames)
+            results.append(result)
+            _print_row(result, baseline.get((name, size)))
+
+    report = {
+        "revision": _revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "byteorder": BYTEORDER,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
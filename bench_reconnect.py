@@ -0,0 +1,118 @@
+"""Exercise GeminiLiveClient's pre-warm and reconnect against the local stand-in.
+
+Runs sample3's GeminiLiveClient on a StandInClient whose handshake takes
+``--connect-delay`` ms, with a thread playing the microphone into the
+client's buffers in real time:
+
+* cold: run() with no pre-warm, so the chat waits out the handshake
+* warm: prewarm() first, as ChatApp does at startup, then run()
+* drops: a warm chat whose session is dropped every ``--drop-every``
+  seconds, with the first ``--fail-connects`` reconnect attempts after
+  each drop refused
+
+Each scenario reports how long the chat waited before audio could be
+sent, connect latency, reconnects, and whether any mic audio was lost::
+
+    python bench_reconnect.py
+    python bench_reconnect.py --connect-delay 800 --drop-every 1.5 --fail-connects 2
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+from audio_pipeline import AudioRing, JitterBuffer
+from live_standin import StandInClient
+import sample3
+
+
+class StandInAudio:
+    """The parts of sample3.AudioHandler the client uses, with a thread for a mic."""
+
+    def __init__(self, chunk=sample3.CHUNK_SIZE):
+        self.input_ring = AudioRing.for_duration(sample3.INPUT_BUFFER_SECONDS, sample3.INPUT_RATE,
+                                                 sample3.INPUT_OVERFLOW)
+        self.input_ready = asyncio.Event()
+        self.playback = JitterBuffer(AudioRing.for_duration(1.0, sample3.OUTPUT_RATE))
+        self.loop = None
+        self.chunk = chunk
+        self.produced = 0  # mic bytes written into the ring
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start_audio_streams(self):
+        self._thread = threading.Thread(target=self._mic, daemon=True)
+        self._thread.start()
+
+    def _mic(self):
+        data = bytes(range(256)) * (self.chunk * 2 // 256 + 1)
+        data = data[: self.chunk * 2]
+        period = self.chunk / sample3.INPUT_RATE
+        deadline = time.monotonic()
+        while not self._stop.is_set():
+            deadline += period
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.input_ring.write(data)
+            self.produced += len(data)
+            if not self.input_ready.is_set():
+                self.loop.call_soon_threadsafe(self.input_ready.set)
+
+    def stop_streams(self):
+        self._stop.set()
+        self._thread.join()
+        self.input_ring.close()
+        self.playback.ring.close()
+
+
+async def run_scenario(name, args, prewarm, drop_every=None):
+    standin = StandInClient(connect_delay=args.connect_delay / 1000)
+    audio = StandInAudio()
+    client = sample3.GeminiLiveClient(audio, lambda text, color: None, client=standin)
+    if prewarm:
+        client.prewarm()
+        await client.session_ready.wait()
+
+    async def drops():
+        while True:
+            await client.session_ready.wait()
+            await asyncio.sleep(drop_every)
+            standin.fail_connects = args.fail_connects
+            standin.session.drop()
+
+    chat = asyncio.create_task(client.run())
+    dropper = asyncio.create_task(drops()) if drop_every else None
+    await asyncio.sleep(args.seconds)
+    if dropper:
+        dropper.cancel()
+    client.stop_event.set()
+    await chat
+
+    sent = sum(session.audio_bytes for session in standin.sessions)
+    # Audio still buffered at stop was never due to be sent; anything else missing was lost
+    unsent = audio.input_ring.occupancy + client.uplink.unsent_bytes
+    stats = client.connection_stats()
+    print(f"{name:>5} {stats['start_wait_ms']:>9.1f} {stats['connect_mean_ms']:>10.1f} "
+          f"{stats['connects']:>8} {stats['reconnects']:>10} {stats['connect_failures']:>8} "
+          f"{audio.produced - sent - unsent:>10} {audio.input_ring.bytes_dropped:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exercise Live API pre-warm and reconnect offline")
+    parser.add_argument("--connect-delay", type=float, default=400, help="stand-in handshake in ms")
+    parser.add_argument("--seconds", type=float, default=4.0, help="length of each chat")
+    parser.add_argument("--drop-every", type=float, default=1.0, help="seconds between dropped sessions")
+    parser.add_argument("--fail-connects", type=int, default=1,
+                        help="reconnect attempts refused after each drop")
+    args = parser.parse_args()
+
+    print(f"{'':>5} {'wait_ms':>9} {'connect_ms':>10} {'connects':>8} {'reconnects':>10} "
+          f"{'failures':>8} {'lost_bytes':>10} {'ring_dropped':>12}")
+    asyncio.run(run_scenario("cold", args, prewarm=False))
+    asyncio.run(run_scenario("warm", args, prewarm=True))
+    asyncio.run(run_scenario("drops", args, prewarm=True, drop_every=args.drop_every))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark uplink packetization against the local Live API stand-in.
+
+A thread plays the microphone, writing CHUNK_SIZE-sample chunks into an
+AudioRing in real time, and an UplinkPacketizer sends them to a
+StandInSession. For each packet size / max delay pair this reports the
+send rate, the CPU spent per second of audio, and how long audio was held
+waiting for its packet:
+
+    python bench_uplink.py
+    python bench_uplink.py --configs 0:0,64:50,200:150 --message-overhead 1
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+from audio_pipeline import AudioRing, UplinkPacketizer
+from live_standin import StandInSession
+
+RATE = 16000
+CHUNK_SIZE = 512
+# packet_ms:max_delay_ms; 0:0 sends every mic chunk on its own
+DEFAULT_CONFIGS = "0:0,64:50,128:100,256:200"
+
+
+def _mic(ring, ready, loop, seconds, chunk, stop):
+    """Write silence-free test audio at the real-time chunk rate."""
+    data = bytes(range(256)) * (chunk * 2 // 256 + 1)
+    data = data[: chunk * 2]
+    period = chunk / RATE
+    deadline = time.monotonic()
+    end = deadline + seconds
+    while not stop.is_set() and deadline < end:
+        deadline += period
+        delay = deadline - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        ring.write(data)
+        if not ready.is_set():  # as AudioHandler._input_callback does
+            loop.call_soon_threadsafe(ready.set)
+    ring.close()
+    loop.call_soon_threadsafe(ready.set)
+
+
+async def bench_config(packet_ms, max_delay_ms, seconds, chunk, message_overhead):
+    ring = AudioRing.for_duration(2.0, RATE)
+    ready = asyncio.Event()
+    session = StandInSession(message_overhead)
+    packet_seconds = packet_ms / 1000 if packet_ms else chunk / RATE
+    packetizer = UplinkPacketizer.for_duration(ring, ready, packet_seconds, max_delay_ms / 1000)
+
+    async def send(data):
+        await session.send(input={"data": data, "mime_type": "audio/pcm"}, end_of_turn=False)
+
+    stop = threading.Event()
+    mic = threading.Thread(target=_mic, args=(ring, ready, asyncio.get_running_loop(), seconds, chunk, stop))
+    cpu = time.process_time()
+    mic.start()
+    try:
+        await packetizer.run(send)
+    finally:
+        stop.set()
+        mic.join()
+    cpu = time.process_time() - cpu
+
+    stats = packetizer.stats()
+    audio_seconds = stats["bytes"] / (RATE * 2)
+    return {
+        "packet_ms": packet_ms,
+        "max_delay_ms": max_delay_ms,
+        "packets_per_s": stats["packets"] / audio_seconds,
+        "mean_packet_bytes": stats["mean_packet_bytes"],
+        "wire_bytes_per_s": session.wire_bytes / audio_seconds,
+        "cpu_ms_per_s": cpu / audio_seconds * 1000,
+        "hold_mean_ms": stats["hold_mean_ms"],
+        "hold_max_ms": stats["hold_max_ms"],
+        "dropped_bytes": ring.bytes_dropped,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark mic uplink packetization offline")
+    parser.add_argument("--configs", default=DEFAULT_CONFIGS,
+                        help="comma-separated packet_ms:max_delay_ms pairs (0:0 = one send per chunk)")
+    parser.add_argument("--seconds", type=float, default=3.0, help="audio per configuration")
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="mic samples per callback")
+    parser.add_argument("--message-overhead", type=float, default=0.0,
+                        help="simulated per-message network cost in ms")
+    args = parser.parse_args()
+
+    print(f"{'packet_ms':>9} {'delay_ms':>8} {'pkts/s':>7} {'pkt_bytes':>9} {'wire_B/s':>9} "
+          f"{'cpu_ms/s':>8} {'hold_ms':>7} {'hold_max':>8}")
+    for pair in args.configs.split(","):
+        packet_ms, max_delay_ms = (float(v) for v in pair.split(":"))
+        r = asyncio.run(bench_config(packet_ms, max_delay_ms, args.seconds, args.chunk,
+                                     args.message_overhead / 1000))
+        print(f"{r['packet_ms']:>9.0f} {r['max_delay_ms']:>8.0f} {r['packets_per_s']:>7.1f} "
+              f"{r['mean_packet_bytes']:>9.0f} {r['wire_bytes_per_s']:>9.0f} {r['cpu_ms_per_s']:>8.2f} "
+              f"{r['hold_mean_ms']:>7.1f} {r['hold_max_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""Layer compositing for the LED animations: several effects, one frame.
+
+Each animation draws into its own Layer, an off-screen Pi5Pixelbuf whose
+show() only snapshots the frame. A Compositor blends the visible layers
+into the strip's ``frame`` as whole-frame NumPy operations, bottom to top,
+with per-layer alpha and blend mode, then calls the strip's show() once:
+one conversion and one transmit per output frame however many layers
+drew. CrossfadeSequence plays layers in turn like AnimationSequence, but
+fades each entry in over the last one instead of cutting.
+
+    compositor = Compositor(pixels)
+    plasma = compositor.add_layer(lambda layer: LiquidNeon(layer, 0.01, PURPLE, TEAL))
+    glitch = compositor.add_layer(lambda layer: CyberGlitch(layer, 0.03, JADE))
+    sequence = CrossfadeSequence(compositor, plasma, glitch, advance_interval=5, crossfade=1)
+    FrameScheduler(sequence, fps=100).run()
+"""
+import time
+
+import numpy as np
+
+from led_backends import NullSink
+from pi5_pixelbuf import Pi5Pixelbuf
+
+BLEND_MODES = ("normal", "add", "lighten", "multiply", "screen")
+
+
+class Layer(Pi5Pixelbuf):
+    """Off-screen pixels for one animation.
+
+    Draws land in ``frame`` as on a strip (PixelBuf API, PixelSubset or
+    direct frame writes); ``show()`` copies the frame to ``shown``, which
+    is what the compositor blends. As on a strip, a layer's output only
+    changes when it is shown, and of several show() calls in one step
+    the last wins (as under ``batch()``).
+
+    :param int size: Pixels, as on the output strip.
+    :param str byteorder: The output strip's byteorder, so colours (and
+                          RGBW white handling) parse the same way.
+    :param float alpha: Opacity, 0 (hidden, not animated) to 1.
+    :param str blend: One of BLEND_MODES.
+    """
+
+    def __init__(self, size, byteorder="RGB", alpha=1.0, blend="normal", name=None):
+        super().__init__(None, size, byteorder=byteorder, brightness=1.0, auto_write=False,
+                         skip_duplicates=False, backend=NullSink())
+        if blend not in BLEND_MODES:
+            raise ValueError(f"blend must be one of {BLEND_MODES}")
+        self.name = name
+        self.blend = blend
+        self.animation = None
+        self.shown = np.zeros_like(self._frame)
+        self.changed = True  # shown or alpha changed since the last composite
+        self._alpha = min(max(alpha, 0.0), 1.0)
+
+    @property
+    def alpha(self):
+        return self._alpha
+
+    @alpha.setter
+    def alpha(self, value):
+        value = min(max(value, 0.0), 1.0)
+        if value != self._alpha:
+            self._alpha = value
+            self.changed = True
+
+    def show(self):
+        np.copyto(self.shown, self._frame)
+        self.changed = True
+
+    def show_wire(self, data):
+        """Take a frame in wire byteorder (e.g. a BakedAnimation's) as the shown frame."""
+        if len(data) != self._bytes:
+            raise ValueError(f"Expected {self._bytes} bytes, got {len(data)}")
+        self.shown.reshape(-1)[self._gather] = np.frombuffer(data, dtype=np.uint8)
+        self.changed = True
+
+    def animate(self, show=True):
+        """Step the layer's animation; False when there is none."""
+        if self.animation is None:
+            return False
+        return self.animation.animate(show)
+
+
+class Compositor:
+    """Blend Layers into one strip and send the result once per frame.
+
+    Layers are blended bottom (first added) to top over black. A frame is
+    only composited and sent when a layer drew or changed alpha; hidden
+    layers (alpha 0) are neither animated nor blended. A lone opaque
+    "normal" layer is copied straight through.
+
+    :param pixels: The output Pi5Pixelbuf (or MultiPixelbuf).
+    """
+
+    def __init__(self, pixels):
+        self.pixels = pixels
+        self.layers = []
+        self.frames = 0  # composites sent to the strip
+        shape = pixels.frame.shape
+        self._acc = np.zeros(shape, dtype=np.float32)
+        self._tmp = np.empty(shape, dtype=np.float32)
+        self._blend = {
+            "normal": self._normal,
+            "add": self._add,
+            "lighten": self._lighten,
+            "multiply": self._multiply,
+            "screen": self._screen,
+        }
+
+    def add_layer(self, build=None, alpha=1.0, blend="normal", name=None):
+        """Add a layer on top and return it.
+
+        :param build: Called with the new layer to make the animation that
+                      draws on it, e.g. ``lambda layer: Comet(layer, ...)``.
+        """
+        layer = Layer(len(self.pixels), byteorder=self.pixels.byteorder, alpha=alpha,
+                      blend=blend, name=name)
+        if build is not None:
+            layer.animation = build(layer)
+        self.layers.append(layer)
+        return layer
+
+    def place_above(self, layer, below):
+        """Move ``layer`` to just above ``below`` in the stack."""
+        self.layers.remove(layer)
+        self.layers.insert(self.layers.index(below) + 1, layer)
+        layer.changed = True
+
+    def animate(self, show=True):
+        """Step every visible layer, then composite and send if anything changed.
+
+        :return: True if a frame was composited.
+        """
+        for layer in self.layers:
+            if layer.alpha > 0:
+                layer.animate(show)
+        if not any(layer.changed for layer in self.layers):
+            return False
+        self.composite(show)
+        return True
+
+    def composite(self, show=True):
+        """Blend the visible layers into the strip's frame and show it once."""
+        visible = [layer for layer in self.layers if layer.alpha > 0]
+        for layer in self.layers:
+            layer.changed = False
+        frame = self.pixels.frame
+        bottom = visible[0] if visible else None
+        if bottom is not None and bottom.alpha == 1 and bottom.blend == "normal":
+            if len(visible) == 1:
+                np.copyto(frame, bottom.shown)
+            else:
+                np.copyto(self._acc, bottom.shown)
+                for layer in visible[1:]:
+                    self._blend[layer.blend](layer.shown, layer.alpha)
+                np.copyto(frame, self._acc, casting="unsafe")  # truncates like int()
+        else:
+            self._acc.fill(0)
+            for layer in visible:
+                self._blend[layer.blend](layer.shown, layer.alpha)
+            np.copyto(frame, self._acc, casting="unsafe")
+        self.frames += 1
+        if show:
+            self.pixels.show()
+
+    # --- Blend modes: acc += (mode(acc, src) - acc) * alpha, in place ---
+    def _normal(self, src, alpha):
+        tmp = self._tmp
+        np.subtract(src, self._acc, out=tmp)
+        tmp *= alpha
+        self._acc += tmp
+
+    def _add(self, src, alpha):
+        tmp = self._tmp
+        np.multiply(src, alpha, out=tmp)
+        self._acc += tmp
+        np.minimum(self._acc, 255, out=self._acc)
+
+    def _lighten(self, src, alpha):
+        tmp = self._tmp
+        np.maximum(self._acc, src, out=tmp)
+        tmp -= self._acc
+        tmp *= alpha
+        self._acc += tmp
+
+    def _multiply(self, src, alpha):
+        tmp = self._tmp
+        np.multiply(self._acc, src, out=tmp)
+        tmp *= 1 / 255
+        tmp -= self._acc
+        tmp *= alpha
+        self._acc += tmp
+
+    def _screen(self, src, alpha):
+        # screen(a, s) - a == s - a * s / 255
+        tmp = self._tmp
+        np.multiply(self._acc, src, out=tmp)
+        tmp *= -1 / 255
+        tmp += src
+        tmp *= alpha
+        self._acc += tmp
+
+
+class CrossfadeSequence:
+    """Play layers one after another, crossfading between them.
+
+    Only the current layer is visible (and animated) except during a
+    crossfade, when the incoming layer is placed just above the outgoing
+    one and faded from 0 to 1 over ``crossfade`` seconds. Layers not in
+    the sequence (overlays) keep their own alpha and stacking.
+
+    :param compositor: Compositor holding the layers.
+    :param float advance_interval: Seconds between the starts of successive
+                                   entries (None = only on next()).
+    :param float crossfade: Fade length in seconds (0 = hard cut).
+    :param bool auto_clear: Clear a layer once it has faded out.
+    :param bool auto_reset: reset() an entry's animation as it fades in.
+    """
+
+    def __init__(self, compositor, *layers, advance_interval=None, crossfade=1.0, auto_clear=True,
+                 auto_reset=False):
+        if not layers:
+            raise ValueError("CrossfadeSequence needs at least one layer")
+        self.compositor = compositor
+        self.layers = layers
+        self.advance_interval = advance_interval
+        self.crossfade = crossfade
+        self.auto_clear = auto_clear
+        self.auto_reset = auto_reset
+        self._current = 0
+        self._incoming = None
+        self._fade_start = 0.0
+        for layer in layers:
+            layer.alpha = 0.0
+        layers[0].alpha = 1.0
+        self._advanced_at = time.monotonic()
+
+    @property
+    def current_layer(self):
+        """The entry playing (the outgoing one while a crossfade runs)."""
+        return self.layers[self._current]
+
+    def next(self):
+        """Start the crossfade to the next entry, finishing any fade in progress."""
+        if self._incoming is not None:
+            self._finish_fade()
+        now = time.monotonic()
+        self._advanced_at = now
+        self._fade_start = now
+        self._incoming = (self._current + 1) % len(self.layers)
+        incoming = self.layers[self._incoming]
+        if incoming is self.current_layer:
+            self._incoming = None
+            return
+        if self.auto_reset and incoming.animation is not None:
+            incoming.animation.reset()
+        self.compositor.place_above(incoming, self.current_layer)
+        incoming.alpha = 0.0
+        if self.crossfade <= 0:
+            self._finish_fade()
+
+    def _finish_fade(self):
+        outgoing = self.current_layer
+        outgoing.alpha = 0.0
+        if self.auto_clear:
+            outgoing.fill(0)
+            outgoing.show()
+        self._current = self._incoming
+        self._incoming = None
+        self.current_layer.alpha = 1.0
+
+    def animate(self, show=True):
+        """Advance or fade as due, then step the compositor (see Compositor.animate())."""
+        now = time.monotonic()
+        if (self._incoming is None and self.advance_interval
+                and now - self._advanced_at >= self.advance_interval):
+            self.next()
+        if self._incoming is not None:
+            progress = (now - self._fade_start) / self.crossfade
+            if progress >= 1:
+                self._finish_fade()
+            else:
+                # alpha 0 would hide it for the frame; start just above
+                self.layers[self._incoming].alpha = max(progress, 1e-6)
+        return self.compositor.animate(show)
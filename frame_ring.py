@@ -0,0 +1,429 @@
+"""Out-of-process LED rendering over a shared-memory frame ring.
+
+Rendering, transmitting and (in sample3.py) audio share one GIL when they
+run as threads, so a heavy animation stalls audio callbacks and a slow
+``neopixel_write`` stalls rendering. OutOfProcessRenderer splits them:
+
+* a render process runs the animations on a FrameScheduler and publishes
+  each finished frame into a FrameRing (``RingPixels.show()``);
+* an output process owns the Pi5Pixelbuf and transmits the latest
+  complete frame, so frames rendered while the wire was busy are dropped
+  (and counted) instead of queued.
+
+FrameRing is lock-free: one writer and one reader per ring, coordinated by
+per-slot sequence counters (a seqlock) in the shared memory itself, with
+a per-slot CRC-32 to catch the torn reads the counters alone can miss.
+
+    renderer = OutOfProcessRenderer(open_pixels, build_sequence, NUM_PIXELS, byteorder="BGR")
+    renderer.start()
+    ...
+    renderer.stop()  # the output process clears the strip on the way out
+    print(renderer.report())
+
+``open_pixels`` and ``build`` run in the child processes, so they must be
+module-level functions (they are pickled by reference).
+"""
+import multiprocessing
+import signal
+import struct
+import threading
+import time
+import zlib
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from frame_scheduler import FrameScheduler
+from frame_stats import RollingHistogram
+from led_backends import NullSink
+from pi5_pixelbuf import Pi5Pixelbuf
+
+# Header words (uint64) at the start of the shared memory
+_FRAME_BYTES, _SLOTS, _WRITTEN, _STOP, _READ, _SKIPPED, _RETRIES, _MISSED, _FAILED = range(9)
+_HEADER_WORDS = 9
+_STAMP = struct.Struct("d")  # a timestamp as it is covered by the slot's CRC
+
+READ_ATTEMPTS = 3  # read_latest() tries before giving up until the next call
+
+PARENT_CHECK_SECONDS = 0.5  # how often the children check the parent is still running
+
+
+class FrameRing:
+    """A ring of ``slots`` fixed-size frames in shared memory.
+
+    Use ``create()`` in the process that owns the ring and ``attach(name)``
+    in the others. The writer's ``write()`` marks the slot's counter odd,
+    copies the frame, a timestamp and the CRC-32 of both in, marks it
+    even, then publishes the frame count. A reader copies a slot out and
+    keeps it only if the counter held the same even value before and after
+    and the frame and timestamp match the CRC; otherwise it retries, up to
+    ``READ_ATTEMPTS`` times per read_latest() call.
+
+    The counters alone assume the stores become visible to the other
+    process in program order, which neither NumPy nor CPython promises on
+    weakly ordered CPUs such as the Pi 5's ARM64. The CRC is what rejects
+    a copy torn by reordering there, with a 1 in 2**32 chance of missing
+    one.
+
+    Counters (in the shared header, readable from any process):
+    ``written``, ``read``, ``skipped`` (written but never read: the reader
+    only wanted the latest, or the writer lapped it), ``retries`` and
+    ``failed`` (read_latest() calls that gave up after every attempt).
+    """
+
+    def __init__(self, shm, owner):
+        self._shm = shm
+        self._owner = owner
+        self._header = np.ndarray(_HEADER_WORDS, dtype=np.uint64, buffer=shm.buf)
+        self.frame_bytes = int(self._header[_FRAME_BYTES])
+        self.slots = int(self._header[_SLOTS])
+        offset = _HEADER_WORDS * 8
+        self._sequences = np.ndarray(self.slots, dtype=np.uint64, buffer=shm.buf, offset=offset)
+        offset += self.slots * 8
+        self._stamps = np.ndarray(self.slots, dtype=np.float64, buffer=shm.buf, offset=offset)
+        offset += self.slots * 8
+        self._checksums = np.ndarray(self.slots, dtype=np.uint64, buffer=shm.buf, offset=offset)
+        offset += self.slots * 8
+        self._frames = np.ndarray((self.slots, self.frame_bytes), dtype=np.uint8, buffer=shm.buf,
+                                  offset=offset)
+        # Each process keeps its own position: the writer's next frame, the reader's next unread one
+        self._written = int(self._header[_WRITTEN])
+        self._next = self._written
+
+    @classmethod
+    def create(cls, frame_bytes, slots=4):
+        size = (_HEADER_WORDS + 3 * slots) * 8 + slots * frame_bytes
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        header = np.ndarray(_HEADER_WORDS, dtype=np.uint64, buffer=shm.buf)
+        header[:] = 0
+        header[_FRAME_BYTES] = frame_bytes
+        header[_SLOTS] = slots
+        del header
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def stopping(self):
+        """True once stop() has been called from any process."""
+        return bool(self._header[_STOP])
+
+    def stop(self):
+        self._header[_STOP] = 1
+
+    def counters(self):
+        header = self._header
+        return {
+            "written": int(header[_WRITTEN]),
+            "read": int(header[_READ]),
+            "skipped": int(header[_SKIPPED]),
+            "retries": int(header[_RETRIES]),
+            "missed": int(header[_MISSED]),
+            "failed": int(header[_FAILED]),
+        }
+
+    def note_missed(self, count):
+        """Record the writer's own missed frames (e.g. render deadlines)."""
+        self._header[_MISSED] = count
+
+    # --- Writer side ---
+    def write(self, data):
+        """Publish one frame (``frame_bytes`` of any buffer, e.g. a uint8 array)."""
+        n = self._written
+        slot = n % self.slots
+        # Aligned 8-byte stores are atomic on 64-bit cores; odd = being written
+        self._sequences[slot] = 2 * n + 1
+        frame = np.frombuffer(data, dtype=np.uint8)
+        np.copyto(self._frames[slot], frame)
+        stamp = time.perf_counter()  # CLOCK_MONOTONIC: comparable across processes
+        self._stamps[slot] = stamp
+        self._checksums[slot] = zlib.crc32(_STAMP.pack(stamp), zlib.crc32(frame))
+        self._sequences[slot] = 2 * n + 2
+        self._written = n + 1
+        self._header[_WRITTEN] = n + 1
+        return n
+
+    # --- Reader side ---
+    def read(self, n, out):
+        """Copy frame ``n`` into ``out``; its timestamp, or None if it was overwritten or torn."""
+        slot = n % self.slots
+        complete = 2 * n + 2
+        if self._sequences[slot] != complete:
+            return None
+        np.copyto(out, self._frames[slot])
+        stamp = float(self._stamps[slot])
+        checksum = int(self._checksums[slot])
+        if self._sequences[slot] != complete:
+            return None  # the writer lapped the slot while we copied
+        if zlib.crc32(_STAMP.pack(stamp), zlib.crc32(out)) != checksum:
+            return None  # torn after all: the writer's stores arrived out of order
+        return stamp
+
+    def read_latest(self, out):
+        """Copy the newest complete frame into ``out`` if there is one not read yet.
+
+        Returns its timestamp (``time.perf_counter()`` when it was written), or
+        None. Frames written since the last read but older than this one
+        count as skipped. After ``READ_ATTEMPTS`` failed copies it returns
+        None (counted as failed), so a reader polling on a fixed cadence
+        never spins on a slot that will not validate.
+        """
+        header = self._header
+        for _ in range(READ_ATTEMPTS):
+            written = int(header[_WRITTEN])
+            if written == self._next:
+                return None
+            stamp = self.read(written - 1, out)
+            if stamp is not None:
+                header[_SKIPPED] += written - 1 - self._next
+                header[_READ] += 1
+                self._next = written
+                return stamp
+            header[_RETRIES] += 1
+        header[_FAILED] += 1
+        return None
+
+    def drain(self, out, tap):
+        """Call ``tap(out, timestamp)`` for each unread frame, oldest first.
+
+        For streams where every frame matters (audio chunks). Frames the
+        writer lapped before they were read count as skipped. Returns the
+        number of frames passed to ``tap``.
+        """
+        header = self._header
+        written = int(header[_WRITTEN])
+        if written - self._next >= self.slots:
+            # The oldest slot may be rewritten any moment; start one newer
+            lapped = written - self.slots + 1 - self._next
+            header[_SKIPPED] += lapped
+            self._next += lapped
+        count = 0
+        while self._next < written:
+            stamp = self.read(self._next, out)
+            self._next += 1
+            if stamp is None:
+                header[_SKIPPED] += 1
+                continue
+            tap(out, stamp)
+            count += 1
+        header[_READ] += count
+        return count
+
+    def close(self):
+        """Detach; the owner also frees the shared memory."""
+        # The array views must go before the mapping can be closed
+        self._header = self._sequences = self._stamps = self._checksums = self._frames = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+class RingPixels(Pi5Pixelbuf):
+    """Pixels whose show() publishes the logical frame to a FrameRing.
+
+    Animations draw into it as into a strip. Brightness, gamma and
+    byteorder are left to the strip in the output process; ``byteorder``
+    here only decides how colours are parsed (RGB or RGBW).
+    """
+
+    def __init__(self, ring, size, byteorder="RGB"):
+        super().__init__(None, size, byteorder=byteorder, brightness=1.0, auto_write=False,
+                         skip_duplicates=False, backend=NullSink())
+        if ring.frame_bytes != self._frame_flat.size:
+            raise ValueError(f"ring frames are {ring.frame_bytes} bytes, pixels need {self._frame_flat.size}")
+        self.ring = ring
+
+    def show(self):
+        if self._batch_depth:
+            self._batch_pending = True
+            self.shows_deferred += 1
+            return
+        self.ring.write(self._frame_flat)
+        self.frames_sent += 1
+
+    def show_wire(self, data):
+        """Publish a frame in wire byteorder (e.g. a BakedAnimation's)."""
+        if len(data) != self._bytes:
+            raise ValueError(f"Expected {self._bytes} bytes, got {len(data)}")
+        self._frame_flat[self._gather] = np.frombuffer(data, dtype=np.uint8)
+        self.ring.write(self._frame_flat)
+        self.frames_sent += 1
+
+
+class _ParentWatch:
+    """Lets a child notice, cheaply, that the process that started it has gone."""
+
+    def __init__(self):
+        self._parent = multiprocessing.parent_process()
+        self._next_check = time.monotonic() + PARENT_CHECK_SECONDS
+
+    def gone(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + PARENT_CHECK_SECONDS
+        return self._parent is not None and not self._parent.is_alive()
+
+
+def _render_main(ring_name, audio_name, build, size, byteorder, fps):
+    # Ctrl+C reaches the whole process group; the parent decides when to stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    ring = FrameRing.attach(ring_name)
+    audio = FrameRing.attach(audio_name) if audio_name else None
+    pixels = RingPixels(ring, size, byteorder=byteorder)
+    animation = build(pixels) if audio is None else build(pixels, audio)
+    scheduler = FrameScheduler(animation, fps=fps, policy="drop")
+
+    def watch():
+        parent = _ParentWatch()
+        while not ring.stopping and not parent.gone():
+            ring.note_missed(scheduler.frames_dropped)
+            time.sleep(0.1)
+        scheduler.stop()
+
+    watcher = threading.Thread(target=watch, name="render-watch", daemon=True)
+    watcher.start()
+    try:
+        scheduler.run()
+    finally:
+        watcher.join()
+        ring.note_missed(scheduler.frames_dropped)
+        print(f"Render process: {scheduler.report()}")
+        latency_report = getattr(animation, "latency_report", None)
+        if latency_report is not None:
+            print(f"Render process: {latency_report()}")
+        pixels.close()
+        ring.close()
+        if audio is not None:
+            audio.close()
+
+
+def _output_main(ring_name, open_pixels, poll_interval):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    ring = FrameRing.attach(ring_name)
+    pixels = open_pixels()
+    pixels.auto_write = False
+    frame = pixels.frame.reshape(-1)  # frames are read straight into the strip's frame
+    latency = RollingHistogram()
+    parent = _ParentWatch()
+    try:
+        while not ring.stopping and not parent.gone():
+            written_at = ring.read_latest(frame)
+            if written_at is None:
+                time.sleep(poll_interval)
+                continue
+            pixels.show()
+            latency.add(time.perf_counter() - written_at)
+    finally:
+        # Clear the strip like the in-process scripts do on exit
+        pixels.fill(0)
+        pixels.show()
+        pixels.close()
+        ring.close()
+        t = latency.summary()
+        print(f"Output process: frame written to sent p50 {t['p50']:.2f}  p99 {t['p99']:.2f}  "
+              f"max {t['max']:.2f} ms over {t['count']} frames")
+
+
+class OutOfProcessRenderer:
+    """Render animations in one process and transmit them from another.
+
+    :param open_pixels: Called with no arguments in the output process to
+                        open the strip (a Pi5Pixelbuf or MultiPixelbuf).
+    :param build: Called in the render process with RingPixels (and the
+                  audio FrameRing, when ``audio_chunk_bytes`` is set) to make
+                  the animation; anything with ``animate()``.
+    :param int size: Pixels on the strip.
+    :param str byteorder: The strip's byteorder (for its RGB/RGBW channels).
+    :param float fps: Render rate.
+    :param int slots: Frames in the ring; more slots give the output more
+                      time to copy the newest frame before it is rewritten.
+    :param int audio_chunk_bytes: Also make a ring of mic chunks of this size
+                                  that push_audio() feeds and build() reads.
+    :param int audio_slots: Chunks that ring holds.
+    :param float poll_interval: Output process sleep while no new frame is due.
+    """
+
+    def __init__(self, open_pixels, build, size, byteorder="BGR", fps=100, slots=4,
+                 audio_chunk_bytes=None, audio_slots=32, poll_interval=0.001):
+        self.open_pixels = open_pixels
+        self.build = build
+        self.size = size
+        self.byteorder = byteorder
+        self.fps = fps
+        self.slots = slots
+        self.audio_chunk_bytes = audio_chunk_bytes
+        self.audio_slots = audio_slots
+        self.poll_interval = poll_interval
+        self.ring = None
+        self.audio = None
+        self._processes = []
+        self._last_counters = None
+
+    def start(self):
+        bpp = len(self.byteorder)
+        self.ring = FrameRing.create(self.size * bpp, self.slots)
+        if self.audio_chunk_bytes:
+            self.audio = FrameRing.create(self.audio_chunk_bytes, self.audio_slots)
+        # spawn, not fork: the parent may be running threads (tkinter, PyAudio, asyncio)
+        context = multiprocessing.get_context("spawn")
+        audio_name = self.audio.name if self.audio is not None else None
+        self._processes = [
+            context.Process(target=_output_main, name="led-output",
+                            args=(self.ring.name, self.open_pixels, self.poll_interval)),
+            context.Process(target=_render_main, name="led-render",
+                            args=(self.ring.name, audio_name, self.build, self.size, self.byteorder,
+                                  self.fps)),
+        ]
+        for process in self._processes:
+            process.start()
+
+    def push_audio(self, pcm):
+        """A mic tap: hand one chunk to the render process. Never blocks."""
+        self.audio.write(pcm)
+
+    def stop(self, timeout=3.0):
+        """Stop both processes (the output one clears the strip) and free the rings."""
+        if self.ring is None:
+            return
+        self.ring.stop()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._processes = []
+        self._last_counters = self.ring.counters()
+        self.ring.close()
+        self.ring = None
+        if self.audio is not None:
+            self._last_counters["audio_skipped"] = self.audio.counters()["skipped"]
+            self.audio.close()
+            self.audio = None
+
+    def stats(self):
+        """Frame ring counters; still available after stop()."""
+        if self.ring is None:
+            return dict(self._last_counters or {})
+        counters = self.ring.counters()
+        if self.audio is not None:
+            counters["audio_skipped"] = self.audio.counters()["skipped"]
+        return counters
+
+    def report(self):
+        """One-line summary of stats() for printing."""
+        s = self.stats()
+        if not s:
+            return "Frame ring: not started"
+        line = (f"Frame ring: {s['written']} frames rendered ({s['missed']} render deadlines missed), "
+                f"{s['read']} sent, {s['skipped']} dropped as stale, {s['retries']} reads retried "
+                f"({s['failed']} given up)")
+        if "audio_skipped" in s:
+            line += f", {s['audio_skipped']} mic chunks dropped"
+        return line
@@ -0,0 +1,158 @@
+"""Deadline-based frame pacing for the LED animations."""
+import math
+import time
+
+
+class FrameScheduler:
+    """Drive ``animate()`` at a fixed frame rate on monotonic deadlines.
+
+    Between frames the scheduler sleeps until the next deadline instead of
+    spinning. When a frame runs long, the ``policy`` decides what happens to
+    the deadlines that were missed:
+
+    * ``"drop"``: skip them and realign to the next deadline in the future.
+    * ``"catchup"``: run up to ``max_catchup`` late frames back to back, then
+      drop the rest.
+
+    :param animation: Anything with an ``animate()`` method (Animation,
+                      AnimationGroup, AnimationSequence).
+    :param float fps: Target frame rate.
+    :param str policy: ``"drop"`` or ``"catchup"``.
+    :param int max_catchup: Late frames ``"catchup"`` may run back to back.
+    :param frame_stats: FrameStats (see frame_stats.py) to record render time
+                        and dropped frames into; share it with the Pi5Pixelbuf
+                        so the time spent in show() is not counted as render.
+    :param float stats_interval: Print ``frame_stats.report()`` this often, in
+                                 seconds (None = never).
+    """
+
+    POLICIES = ("drop", "catchup")
+
+    def __init__(self, animation, fps=60, policy="drop", max_catchup=2, frame_stats=None,
+                 stats_interval=None):
+        if fps <= 0:
+            raise ValueError("fps must be positive")
+        if policy not in self.POLICIES:
+            raise ValueError(f"policy must be one of {self.POLICIES}")
+        if stats_interval is not None and frame_stats is None:
+            raise ValueError("stats_interval needs frame_stats")
+        self.animation = animation
+        self.fps = fps
+        self.policy = policy
+        self.max_catchup = max_catchup
+        self.frame_stats = frame_stats
+        self.stats_interval = stats_interval
+        self._running = False
+        self.reset_stats()
+
+    @property
+    def period(self):
+        """Frame period in seconds."""
+        return 1.0 / self.fps
+
+    def reset_stats(self):
+        """Clear the frame, drop and timing counters."""
+        self.frames = 0  # frame ticks run (animate() calls)
+        self.frames_drawn = 0  # ticks where animate() actually drew
+        self.frames_dropped = 0  # deadlines skipped because a frame ran late
+        self._started = None
+        self._elapsed = 0.0
+        self._late_sum = 0.0
+        self._late_sq_sum = 0.0
+        self._late_max = 0.0
+
+    def stop(self):
+        """Ask run() to return after the current frame."""
+        self._running = False
+
+    def run(self, duration=None):
+        """Run frames until stop() is called or ``duration`` seconds pass."""
+        period = self.period
+        now = time.monotonic()
+        end = None if duration is None else now + duration
+        self._started = now
+        deadline = now
+        next_dump = None if self.stats_interval is None else now + self.stats_interval
+        self._running = True
+        try:
+            while self._running:
+                now = time.monotonic()
+                if end is not None and now >= end:
+                    break
+                if now < deadline:
+                    time.sleep(deadline - now)
+                    now = time.monotonic()
+                self._record_lateness(now - deadline)
+
+                if self.frame_stats is None:
+                    drew = self.animation.animate()
+                else:
+                    drew = self._timed_animate()
+                if drew:
+                    self.frames_drawn += 1
+                self.frames += 1
+                deadline += period
+
+                # More than a whole frame behind: apply the slip policy
+                behind = time.monotonic() - deadline
+                if behind >= period:
+                    if self.policy == "catchup":
+                        missed = max(0, int(behind // period) - self.max_catchup)
+                    else:
+                        # Skip the overdue deadline too, so the next one is in the future
+                        missed = int(behind // period) + 1
+                    self.frames_dropped += missed
+                    deadline += missed * period
+                    if self.frame_stats is not None:
+                        self.frame_stats.frames_dropped += missed
+
+                if next_dump is not None and now >= next_dump:
+                    print(self.frame_stats.report())
+                    next_dump += self.stats_interval
+        finally:
+            self._running = False
+            self._elapsed += time.monotonic() - self._started
+
+    def _timed_animate(self):
+        stats = self.frame_stats
+        send_before = stats.send_seconds
+        start = time.perf_counter()
+        drew = self.animation.animate()
+        if drew:
+            # Whatever animate() did outside show() is render time
+            stats.render.add(time.perf_counter() - start - (stats.send_seconds - send_before))
+        return drew
+
+    def _record_lateness(self, late):
+        self._late_sum += late
+        self._late_sq_sum += late * late
+        if late > self._late_max:
+            self._late_max = late
+
+    def stats(self):
+        """Return achieved FPS, jitter and drop counts as a dict."""
+        elapsed = self._elapsed
+        if self._running and self._started is not None:
+            elapsed += time.monotonic() - self._started
+        frames = self.frames
+        mean = self._late_sum / frames if frames else 0.0
+        variance = self._late_sq_sum / frames - mean * mean if frames else 0.0
+        return {
+            "target_fps": self.fps,
+            "achieved_fps": frames / elapsed if elapsed > 0 else 0.0,
+            "frames": frames,
+            "frames_drawn": self.frames_drawn,
+            "frames_dropped": self.frames_dropped,
+            "mean_late_ms": mean * 1000,
+            "jitter_ms": math.sqrt(max(variance, 0.0)) * 1000,
+            "max_late_ms": self._late_max * 1000,
+        }
+
+    def report(self):
+        """One-line summary of stats() for printing."""
+        s = self.stats()
+        return (
+            f"{s['achieved_fps']:.1f}/{s['target_fps']} fps, {s['frames']} frames "
+            f"({s['frames_drawn']} drawn, {s['frames_dropped']} dropped), "
+            f"jitter {s['jitter_ms']:.2f} ms, max late {s['max_late_ms']:.2f} ms"
+        )
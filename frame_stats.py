@@ -0,0 +1,134 @@
+"""Opt-in per-frame timing for the LED hot path.
+
+Attach a FrameStats to a Pi5Pixelbuf (``pixels.stats = FrameStats()``) to
+time the colour conversion and the backend write of every frame, and pass
+the same object to FrameScheduler to time the animations' render step.
+Each stage keeps the durations of its last ``window`` frames; percentiles
+and bucket counts are only worked out when a report is asked for, so a
+recorded frame costs a few clock reads and list stores. With ``stats``
+left at None nothing is timed at all.
+"""
+import time
+
+import numpy as np
+
+# Bucket upper edges for histogram(), in milliseconds
+BUCKET_EDGES_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50)
+
+
+class RollingHistogram:
+    """Durations (in seconds) of the last ``window`` events."""
+
+    def __init__(self, window=1024):
+        self._samples = [0.0] * window
+        self._window = window
+        self._index = 0
+        self.count = 0  # events recorded since the last reset
+
+    def add(self, seconds):
+        self._samples[self._index] = seconds
+        self._index = (self._index + 1) % self._window
+        self.count += 1
+
+    def reset(self):
+        self._index = 0
+        self.count = 0
+
+    def samples(self):
+        """The retained durations as a NumPy array, oldest first."""
+        if self.count < self._window:
+            return np.array(self._samples[: self._index])
+        return np.array(self._samples[self._index :] + self._samples[: self._index])
+
+    def summary(self):
+        """Mean, percentiles and max of the window in milliseconds."""
+        samples = self.samples() * 1000
+        if not len(samples):
+            return {"count": self.count, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+        return {
+            "count": self.count,
+            "mean": float(samples.mean()),
+            "p50": float(p50),
+            "p95": float(p95),
+            "p99": float(p99),
+            "max": float(samples.max()),
+        }
+
+    def histogram(self):
+        """Counts per BUCKET_EDGES_MS bucket; the last entry counts the overflow."""
+        samples = self.samples() * 1000
+        return np.histogram(samples, bins=(0,) + BUCKET_EDGES_MS + (np.inf,))[0].tolist()
+
+
+class FrameStats:
+    """Rolling timings for the render, convert and transmit stages plus counters.
+
+    * ``render``: animation draw time per drawn frame (FrameScheduler)
+    * ``convert``: brightness/byteorder conversion in show()
+    * ``transmit``: the backend write (``neopixel_write``), on the transmit
+      thread in async mode
+
+    :param int window: Frames each histogram keeps.
+    """
+
+    STAGES = ("render", "convert", "transmit")
+
+    def __init__(self, window=1024):
+        self.render = RollingHistogram(window)
+        self.convert = RollingHistogram(window)
+        self.transmit = RollingHistogram(window)
+        self.reset()
+
+    def reset(self):
+        """Clear the histograms and counters."""
+        for stage in self.STAGES:
+            getattr(self, stage).reset()
+        self.frames = 0  # frames written to the backend
+        self.frames_skipped = 0  # frames not sent because nothing changed
+        self.frames_dropped = 0  # scheduler deadlines missed
+        self.bytes = 0  # bytes written to the backend
+        self.send_seconds = 0.0  # total time inside show(), to separate render time
+        self._started = time.monotonic()
+
+    def snapshot(self):
+        """Counters and per-stage summaries as a dict."""
+        elapsed = time.monotonic() - self._started
+        result = {
+            "elapsed_s": elapsed,
+            "frames": self.frames,
+            "frames_skipped": self.frames_skipped,
+            "frames_dropped": self.frames_dropped,
+            "bytes": self.bytes,
+            "fps": self.frames / elapsed if elapsed > 0 else 0.0,
+        }
+        for stage in self.STAGES:
+            result[stage] = getattr(self, stage).summary()
+        return result
+
+    def report(self, histograms=False):
+        """Multi-line summary for printing; optionally with bucket bars."""
+        s = self.snapshot()
+        lines = [
+            f"{s['frames']} frames ({s['fps']:.1f}/s), {s['frames_skipped']} skipped, "
+            f"{s['frames_dropped']} dropped, {s['bytes']} bytes in {s['elapsed_s']:.1f}s"
+        ]
+        for stage in self.STAGES:
+            t = s[stage]
+            lines.append(
+                f"  {stage:<9} n={t['count']:<7} mean {t['mean']:.3f}  p50 {t['p50']:.3f}  "
+                f"p95 {t['p95']:.3f}  p99 {t['p99']:.3f}  max {t['max']:.3f} ms"
+            )
+            if histograms and t["count"]:
+                lines.extend(self._bars(getattr(self, stage).histogram()))
+        return "\n".join(lines)
+
+    @staticmethod
+    def _bars(counts, width=30):
+        total = sum(counts) or 1
+        labels = [f"<{edge:g}" for edge in BUCKET_EDGES_MS] + [f">={BUCKET_EDGES_MS[-1]:g}"]
+        return [
+            f"    {label:>6} ms {'#' * round(count / total * width):<{width}} {count}"
+            for label, count in zip(labels, counts)
+            if count
+        ]
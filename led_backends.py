@@ -0,0 +1,280 @@
+"""Transmit backends for Pi5Pixelbuf.
+
+A backend is any object with ``write(buf)`` and ``close()``. ``write`` gets
+the finished wire buffer (brightness and byteorder already applied) and must
+not keep a reference to it after returning.
+
+Run ``python led_backends.py replay FILE`` to push a recording made with
+FrameRecorder back out to the strip at its original timing.
+"""
+import argparse
+import collections
+import mmap
+import struct
+import time
+
+# WS2812 timing: 1.25us per bit plus a >280us latch/reset gap per frame
+WIRE_SECONDS_PER_BIT = 1.25e-6
+WIRE_RESET_SECONDS = 300e-6
+
+
+def wire_seconds(frame_bytes):
+    """Time to clock a frame of ``frame_bytes`` out to a WS2812 strip."""
+    return frame_bytes * 8 * WIRE_SECONDS_PER_BIT + WIRE_RESET_SECONDS
+
+
+class NeopixelWriteBackend:
+    """Send frames to a strip with the Raspberry Pi 5 ``neopixel_write``."""
+
+    def __init__(self, pin):
+        # Imported here so the simulated backends work without Pi 5 hardware
+        from adafruit_raspberry_pi5_neopixel_write import neopixel_write
+
+        self._neopixel_write = neopixel_write
+        self.pin = pin
+
+    def write(self, buf):
+        self._neopixel_write(self.pin, buf)
+
+    def close(self):
+        pass
+
+
+class NullSink:
+    """Discard frames, only counting them. For profiling the render path."""
+
+    def __init__(self):
+        self.frames = 0
+        self.bytes = 0
+
+    def write(self, buf):
+        self.frames += 1
+        self.bytes += len(buf)
+
+    def close(self):
+        pass
+
+
+class WireTimeSink(NullSink):
+    """Discard frames, but block for as long as a real strip takes to latch them.
+
+    Stands in for the hardware when timing matters (latency measurements).
+    """
+
+    def write(self, buf):
+        due = time.perf_counter() + wire_seconds(len(buf))
+        super().write(buf)
+        while time.perf_counter() < due:
+            pass  # sleep() is too coarse for sub-millisecond frames
+
+
+class MemorySink:
+    """Keep copies of the last ``keep`` frames with their monotonic timestamps.
+
+    :param int keep: Frames to retain (None keeps every frame).
+    """
+
+    def __init__(self, keep=1):
+        self.frames = 0
+        self.history = collections.deque(maxlen=keep)
+
+    @property
+    def last_frame(self):
+        """The most recent frame as bytes, or None before the first write."""
+        return self.history[-1][1] if self.history else None
+
+    def write(self, buf):
+        self.frames += 1
+        self.history.append((time.monotonic(), bytes(buf)))
+
+    def close(self):
+        pass
+
+
+# Recording file layout: a fixed header followed by fixed-size records of
+# (uint64 nanoseconds since the first frame, frame bytes).
+_MAGIC = b"LEDREC1\0"
+_HEADER = struct.Struct("<8sII16x")  # magic, frame_bytes, frame_count
+_STAMP = struct.Struct("<Q")
+
+
+class FrameRecorder:
+    """Stream raw frames with timestamps into a memory-mapped file.
+
+    The file is preallocated for ``capacity`` frames and doubled when full,
+    so a write is one timestamp pack and one slice copy into the map.
+
+    :param str path: Recording file to create (overwritten).
+    :param int capacity: Frames to preallocate room for.
+    :param sink: Optional backend that also receives every frame (e.g.
+                 NeopixelWriteBackend to record while driving the strip).
+    """
+
+    def __init__(self, path, capacity=1024, sink=None):
+        self.path = path
+        self.sink = sink
+        self.frames = 0
+        self._capacity = capacity
+        self._frame_bytes = None
+        self._record_bytes = None
+        self._start_ns = None
+        self._file = open(path, "w+b")
+        self._map = None
+
+    def write(self, buf, timestamp_ns=None):
+        """Append ``buf``; ``timestamp_ns`` overrides the monotonic clock."""
+        now = time.monotonic_ns() if timestamp_ns is None else timestamp_ns
+        if self._map is None:
+            self._start_ns = now
+            self._frame_bytes = len(buf)
+            self._record_bytes = _STAMP.size + len(buf)
+            self._resize(self._capacity)
+        elif len(buf) != self._frame_bytes:
+            raise ValueError(f"Frame is {len(buf)} bytes, recording uses {self._frame_bytes}")
+        if self.frames == self._capacity:
+            self._resize(self._capacity * 2)
+
+        offset = _HEADER.size + self.frames * self._record_bytes
+        _STAMP.pack_into(self._map, offset, now - self._start_ns)
+        self._map[offset + _STAMP.size : offset + self._record_bytes] = buf
+        self.frames += 1
+        if self.sink is not None:
+            self.sink.write(buf)
+
+    def _resize(self, capacity):
+        if self._map is not None:
+            self._map.close()
+        self._capacity = capacity
+        self._file.truncate(_HEADER.size + capacity * self._record_bytes)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def close(self):
+        """Write the header, trim unused capacity and close the file."""
+        if self._file.closed:
+            return
+        if self._map is None:
+            self._file.write(_HEADER.pack(_MAGIC, 0, 0))
+        else:
+            _HEADER.pack_into(self._map, 0, _MAGIC, self._frame_bytes, self.frames)
+            self._map.flush()
+            self._map.close()
+            self._file.truncate(_HEADER.size + self.frames * self._record_bytes)
+        self._file.close()
+        if self.sink is not None:
+            self.sink.close()
+
+
+class FrameReplayer:
+    """Read a FrameRecorder file through a memory map.
+
+    Frames are yielded as memoryviews into the map, so playback copies
+    nothing until the backend writes them out.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.frame_bytes, self.frame_count = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a frame recording")
+        self._record_bytes = _STAMP.size + self.frame_bytes
+        self._view = memoryview(self._map)
+
+    def __len__(self):
+        return self.frame_count
+
+    @property
+    def duration(self):
+        """Seconds between the first and last frame."""
+        if not self.frame_count:
+            return 0.0
+        return self.frame(self.frame_count - 1)[0]
+
+    def frame(self, index):
+        """Return (seconds since the first frame, frame memoryview)."""
+        offset = _HEADER.size + index * self._record_bytes
+        (stamp,) = _STAMP.unpack_from(self._map, offset)
+        start = offset + _STAMP.size
+        return stamp / 1e9, self._view[start : start + self.frame_bytes]
+
+    def frames(self):
+        for index in range(self.frame_count):
+            yield self.frame(index)
+
+    def play(self, backend, speed=1.0):
+        """Write every frame to ``backend`` at the recorded timing.
+
+        Returns the worst lateness against the recorded schedule in seconds.
+        """
+        worst = 0.0
+        start = time.monotonic()
+        for stamp, frame in self.frames():
+            due = start + stamp / speed
+            now = time.monotonic()
+            if now < due:
+                time.sleep(due - now)
+            else:
+                worst = max(worst, now - due)
+            backend.write(frame)
+        return worst
+
+    def close(self):
+        self._view.release()
+        self._map.close()
+        self._file.close()
+
+
+def spec_needs_pin(spec):
+    """True if ``backend_from_spec(spec, pin)`` drives a real pin (so needs board)."""
+    return spec.partition(":")[0] in ("neopixel", "record")
+
+
+def backend_from_spec(spec, pin):
+    """Build a backend from a short spec, e.g. for an LED_BACKEND variable.
+
+    ``"neopixel"`` (hardware), ``"null"``, ``"wire"`` (null with WS2812
+    timing), ``"memory"`` or ``"record:PATH"`` (record and also drive the
+    strip) / ``"record-only:PATH"``.
+    """
+    kind, _, arg = spec.partition(":")
+    if kind == "neopixel":
+        return NeopixelWriteBackend(pin)
+    if kind == "null":
+        return NullSink()
+    if kind == "wire":
+        return WireTimeSink()
+    if kind == "memory":
+        return MemorySink()
+    if kind == "record":
+        return FrameRecorder(arg, sink=NeopixelWriteBackend(pin))
+    if kind == "record-only":
+        return FrameRecorder(arg)
+    raise ValueError(f"Unknown LED backend {spec!r}")
+
+
+def _replay_main(args):
+    import board
+
+    replayer = FrameReplayer(args.path)
+    print(f"Replaying {len(replayer)} frames ({replayer.frame_bytes} bytes each, "
+          f"{replayer.duration:.2f}s) on {args.pin}...")
+    backend = NeopixelWriteBackend(getattr(board, args.pin))
+    try:
+        worst = replayer.play(backend, speed=args.speed)
+        print(f"Done. Worst lateness {worst * 1000:.2f} ms.")
+    except KeyboardInterrupt:
+        print("\nInterrupted by user.")
+    finally:
+        # Clear the strip like the other scripts do on exit
+        backend.write(bytearray(replayer.frame_bytes))
+        replayer.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LED frame recording tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    replay = commands.add_parser("replay", help="push a recording to the strip at its original timing")
+    replay.add_argument("path")
+    replay.add_argument("--pin", default="D18", help="board pin name (default D18)")
+    replay.add_argument("--speed", type=float, default=1.0, help="playback speed factor")
+    _replay_main(parser.parse_args())
@@ -0,0 +1,128 @@
+"""Local stand-in for the Gemini Live API, for benchmarks and tests offline.
+
+StandInClient mirrors the part of ``genai.Client`` that sample3.py uses,
+``client.aio.live.connect(model=..., config=...)``, and hands out
+StandInSessions. A session encodes every ``send()`` the way the real
+client does (base64 audio in a JSON message) so per-message costs are
+realistic, and plays back any audio queued with ``queue_audio()``
+through ``receive()`` in the same response shape as the real API.
+
+For connection handling, the client can take ``connect_delay`` seconds
+per handshake and refuse the next ``fail_connects`` attempts, and
+``StandInSession.drop()`` breaks an open session the way a lost socket
+does: its pending and later send() and receive() calls raise
+ConnectionError.
+"""
+import asyncio
+import base64
+import json
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+
+def audio_response(data):
+    """A response carrying one chunk of model audio, shaped like the real API's."""
+    part = SimpleNamespace(inline_data=SimpleNamespace(data=data, mime_type="audio/pcm"))
+    return SimpleNamespace(server_content=SimpleNamespace(
+        model_turn=SimpleNamespace(parts=[part]), turn_complete=False
+    ))
+
+
+def turn_complete_response():
+    """The response that closes a model turn."""
+    return SimpleNamespace(server_content=SimpleNamespace(model_turn=None, turn_complete=True))
+
+
+class StandInSession:
+    """One live session: counts what is sent, replays what is queued.
+
+    :param float message_overhead: Extra seconds each send() takes, to
+                                   model network framing per message.
+    """
+
+    def __init__(self, message_overhead=0.0):
+        self.message_overhead = message_overhead
+        self.messages = 0
+        self.audio_bytes = 0
+        self.wire_bytes = 0
+        self.closed = False
+        self._responses = asyncio.Queue()
+
+    async def send(self, input=None, end_of_turn=False):
+        if self.closed:
+            raise ConnectionError("stand-in session is closed")
+        # Same encoding work as the real client: base64 audio inside JSON
+        message = json.dumps({
+            "realtime_input": {
+                "media_chunks": [{
+                    "data": base64.b64encode(input["data"]).decode("ascii"),
+                    "mime_type": input["mime_type"],
+                }]
+            }
+        })
+        await asyncio.sleep(self.message_overhead)
+        self.messages += 1
+        self.audio_bytes += len(input["data"])
+        self.wire_bytes += len(message)
+
+    async def receive(self):
+        while True:
+            response = await self._responses.get()
+            if response is None:
+                return
+            if isinstance(response, Exception):
+                raise response
+            yield response
+
+    def queue_audio(self, pcm, chunk_bytes=4800, turn_complete=True):
+        """Queue ``pcm`` as model audio, split into ``chunk_bytes`` responses."""
+        for start in range(0, len(pcm), chunk_bytes):
+            self._responses.put_nowait(audio_response(pcm[start : start + chunk_bytes]))
+        if turn_complete:
+            self._responses.put_nowait(turn_complete_response())
+
+    def end_receive(self):
+        """Make the current receive() loop finish, as at the end of a turn."""
+        self._responses.put_nowait(None)
+
+    def drop(self):
+        """Break the session: send() and receive() raise ConnectionError from now on."""
+        self.closed = True
+        self._responses.put_nowait(ConnectionError("stand-in session dropped"))
+
+
+class StandInClient:
+    """Drop-in for ``genai.Client`` whose ``aio.live.connect()`` opens StandInSessions.
+
+    :param float connect_delay: Seconds each connect takes before the
+                                session is handed out (the handshake).
+    :param int fail_connects: Number of upcoming connects to refuse with
+                              ConnectionError, after the delay.
+    """
+
+    def __init__(self, message_overhead=0.0, connect_delay=0.0, fail_connects=0):
+        self.message_overhead = message_overhead
+        self.connect_delay = connect_delay
+        self.fail_connects = fail_connects
+        self.connects = 0  # connect() calls, refused ones included
+        self.sessions = []
+        self.aio = SimpleNamespace(live=SimpleNamespace(connect=self.connect))
+
+    @property
+    def session(self):
+        """The most recently opened session."""
+        return self.sessions[-1] if self.sessions else None
+
+    @asynccontextmanager
+    async def connect(self, model=None, config=None):
+        self.connects += 1
+        await asyncio.sleep(self.connect_delay)
+        if self.fail_connects > 0:
+            self.fail_connects -= 1
+            raise ConnectionError("stand-in connect refused")
+        session = StandInSession(self.message_overhead)
+        self.sessions.append(session)
+        try:
+            yield session
+        finally:
+            session.closed = True
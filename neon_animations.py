@@ -0,0 +1,122 @@
+"""Custom animations for the Pi 5 LED scripts (see sample2.py)."""
+import numpy as np
+
+from adafruit_led_animation.animation import Animation
+from adafruit_led_animation.group import AnimationGroup
+from adafruit_led_animation.color import RED, WHITE
+
+# --- CUSTOM ANIMATION 1: LiquidNeon (Math-based Plasma) ---
+class LiquidNeon(Animation):
+    # offset advances 0.2 rad per frame, so the plasma repeats every 10*pi
+    # frames; 220 frames is 7 repeats to within 0.02 rad (a seamless loop)
+    LOOP_FRAMES = 220
+
+    def __init__(self, pixel_object, speed, color_a, color_b, period=5):
+        super().__init__(pixel_object, speed, color_a)
+        self.color_a = color_a
+        self.color_b = color_b
+        self.period = period
+        self.offset = 0.0
+        # The per-position phase terms never change, so compute them once
+        positions = np.arange(len(pixel_object), dtype=np.float64)
+        self._phase_a = positions * 0.2
+        self._phase_b = positions * 0.15
+
+    def draw(self):
+        # Calculate a sine wave that moves over time
+        self.offset += 0.2
+        # Create a wave based on pixel position and time (whole strip at once)
+        wave = np.sin(self._phase_a + self.offset) + np.cos(self._phase_b - self.offset)
+        # Map wave (-2 to 2) to a mix of color_a and color_b
+        mix = ((wave + 2) / 4.0)[:, np.newaxis]  # Normalize to 0.0 - 1.0
+
+        # Manual color mixing (Linear Interpolation)
+        color_a = np.array(self.color_a[:3], dtype=np.float64)
+        color_b = np.array(self.color_b[:3], dtype=np.float64)
+        mixed = color_a * mix + color_b * (1 - mix)
+
+        # One bulk write for the whole strip: straight into the driver's
+        # framebuffer when it has one (uint8 assignment truncates like int())
+        frame = getattr(self.pixel_object, "frame", None)
+        if frame is not None:
+            write_rgb(frame, mixed)
+        else:
+            self.pixel_object[:] = mixed.astype(np.int64).tolist()
+
+
+# --- CUSTOM ANIMATION 2: CyberGlitch (Randomized Corruption) ---
+class CyberGlitch(Animation):
+    def __init__(self, pixel_object, speed, color, seed=None):
+        # Seed the generator for reproducible runs (benchmarks, recordings)
+        self._rng = np.random.default_rng(seed)
+        self._bpp = len(pixel_object[0])
+        self._faded = np.empty((len(pixel_object), self._bpp), dtype=np.uint16)
+        super().__init__(pixel_object, speed, color)
+
+    def _set_color(self, color):
+        super()._set_color(color)
+        # Random bright color palette, one row per entry in frame channel order
+        self._palette = np.array(
+            [_frame_color(c, self._bpp) for c in (WHITE, color, RED, (0, 255, 0))], dtype=np.uint8
+        )
+
+    def draw(self):
+        frame = getattr(self.pixel_object, "frame", None)
+        live = frame is not None
+        if not live:
+            # e.g. a PixelSubset: read the pixels once, write them back once
+            frame = np.array(self.pixel_object[:], dtype=np.uint8)
+
+        # 1. Dim everything (fade trail): int(x * 0.6) == 3 * x // 5, done
+        # in place for the whole frame with a uint16 scratch against overflow
+        np.multiply(frame, 3, out=self._faded)
+        np.floor_divide(self._faded, 5, out=self._faded)
+        np.copyto(frame, self._faded, casting="unsafe")
+
+        # 2. Inject random "glitches" (bright flashes), all drawn in one batch
+        num_glitches = self._rng.integers(1, 5)
+        indices = self._rng.integers(0, len(frame), size=num_glitches)
+        frame[indices] = self._palette[self._rng.integers(0, len(self._palette), size=num_glitches)]
+
+        if not live:
+            self.pixel_object[:] = frame.tolist()
+
+
+def _frame_color(color, bpp):
+    """Expand a colour to a frame row, using the W channel for greys like PixelBuf does."""
+    if isinstance(color, int):
+        color = (color >> 16 & 0xFF, color >> 8 & 0xFF, color & 0xFF)
+    if bpp == 4 and len(color) == 3:
+        r, g, b = color
+        return (0, 0, 0, r) if r == g == b else (r, g, b, 0)
+    return tuple(color[:bpp])
+
+
+def write_rgb(frame, colors):
+    """Write (pixels, 3) colours into a frame as PixelBuf would set them one by one.
+
+    Values truncate like int(); on RGBW strips greys (r == g == b) go to the
+    W channel and the others get W = 0.
+    """
+    rgb = frame[:, :3]
+    rgb[:] = colors
+    if frame.shape[1] == 4:
+        grey = (rgb[:, 0] == rgb[:, 1]) & (rgb[:, 1] == rgb[:, 2])
+        frame[:, 3] = np.where(grey, rgb[:, 0], 0)
+        rgb[grey] = 0
+
+
+# --- GROUP HELPER: one transmit per frame for split-strip groups ---
+class BatchedGroup(AnimationGroup):
+    """AnimationGroup whose members' show() calls reach the strip as one transmit.
+
+    Each member of a plain group shows its own PixelSubset, which sends the
+    whole parent strip once per member (the first send only half updated).
+    """
+    def __init__(self, pixel_buf, *members, **kwargs):
+        super().__init__(*members, **kwargs)
+        self._pixel_buf = pixel_buf
+
+    def animate(self, show=True):
+        with self._pixel_buf.batch():
+            return super().animate(show)
@@ -0,0 +1,561 @@
+"""Network frame ingest: DDP and E1.31 (sACN) pixel data into a Pi5Pixelbuf.
+
+Lighting controllers (xLights, FPP, WLED, ...) stream pixels over UDP.
+NetworkReceiver reads every datagram with ``recv_into`` into one
+preallocated buffer and copies its channel data straight into the strip's
+logical ``frame`` through cached array views, so no buffer is allocated
+per packet. The frame is converted and sent with a single ``show()`` when
+the sender commits it:
+
+* DDP: on a packet with the PUSH flag.
+* E1.31: on a sync packet for the data's sync address, or, for streams
+  without synchronization, on the packet for the last mapped universe.
+
+Channels arrive as R, G, B[, W] per pixel, the same layout as ``frame``;
+the strip applies brightness, gamma and byteorder as usual. The receiver
+counts packets lost and discarded by sequence number (E1.31 sync packets
+included), synchronized frames whose sync never arrived, and frames
+committed late. It also times each frame from its first packet to the strip, and
+from the sender's DDP timecode to the strip, which needs the two clocks in
+sync (NTP, or loopback).
+
+Run as a script to receive onto a backend, or to send a test pattern:
+
+    python net_ingest.py receive --protocol ddp --backend null --stats 2
+    python net_ingest.py send --protocol ddp --fps 40 --seconds 10
+    python net_ingest.py send --protocol e131 --sync 64000 --drop 0.01
+"""
+import argparse
+import socket
+import struct
+import time
+
+import numpy as np
+
+from frame_stats import RollingHistogram
+
+# --- DDP (Distributed Display Protocol, 3waylabs) ---
+DDP_PORT = 4048
+DDP_HEADER = struct.Struct(">BBBBIH")  # flags, sequence, data type, device id, offset, length
+DDP_TIMECODE = struct.Struct(">I")  # 16.16 seconds, present with the TIMECODE flag
+DDP_VERSION = 0x40  # version 1, in the top two flag bits
+DDP_TIMECODE_FLAG = 0x10
+DDP_REPLY = 0x04
+DDP_QUERY = 0x02
+DDP_PUSH = 0x01
+DDP_DATA_RGB8 = 0x0B
+DDP_DEVICES = (1, 255)  # default output device and broadcast
+DDP_MAX_DATA = 1440  # whole RGB and RGBW pixels within a 1500 byte MTU
+
+# --- E1.31 (Streaming ACN) ---
+E131_PORT = 5568
+ACN_ID = b"ASC-E1.17\0\0\0"
+E131_ROOT_DATA = 0x00000004
+E131_ROOT_EXTENDED = 0x00000008
+E131_FRAMING_DATA = 0x00000002
+E131_EXTENDED_SYNC = 0x00000001
+E131_PREVIEW = 0x80
+E131_TERMINATED = 0x40
+E131_DATA_OFFSET = 126  # first slot after the DMX start code
+E131_SYNC_SIZE = 49
+E131_FRAMING = struct.Struct(">HBBH")  # sync address, sequence, options, universe (at 109)
+_U16 = struct.Struct(">H")
+_U32 = struct.Struct(">I")
+
+RECEIVE_BUFFER_BYTES = 1 << 20  # socket buffer: a few frames of bursts
+
+
+def timecode_now():
+    """The wall clock as a DDP 16.16 timecode (seconds modulo 65536)."""
+    return int(time.time() * 65536) & 0xFFFFFFFF
+
+
+def timecode_age(timecode):
+    """Seconds since ``timecode``, or None if it is in the future (clock skew)."""
+    age = (timecode_now() - timecode) & 0xFFFFFFFF
+    if age >= 0x80000000:
+        return None
+    return age / 65536
+
+
+def e131_multicast_group(universe):
+    return f"239.255.{universe >> 8}.{universe & 0xFF}"
+
+
+def default_channels_per_universe(bpp):
+    """Whole pixels per 512-slot universe: 510 channels for RGB, 512 for RGBW."""
+    return 512 // bpp * bpp
+
+
+class NetworkReceiver:
+    """Receive DDP or E1.31 frames from the network and show them on a strip.
+
+    DDP data offsets are in bytes from ``pixel_offset``. E1.31 universes
+    are mapped in order from ``universe``, ``channels_per_universe`` slots
+    each, onto the pixels from ``pixel_offset``. One source at a time:
+    E1.31 priorities are not arbitrated.
+
+    :param pixels: The Pi5Pixelbuf (or MultiPixelbuf) to show frames on.
+    :param str protocol: "ddp" or "e131".
+    :param int port: UDP port (default: the protocol's).
+    :param bool multicast: Join the mapped universes' E1.31 multicast groups.
+    :param float late_after: A frame committed more than this many seconds
+                             after it was sent (or after its first packet
+                             arrived, without a timecode) counts as late.
+    :param int window: Frames each latency histogram keeps.
+    """
+
+    def __init__(self, pixels, protocol="ddp", host="0.0.0.0", port=None, universe=1,
+                 channels_per_universe=None, pixel_offset=0, multicast=False, late_after=0.025,
+                 window=1024):
+        if protocol not in ("ddp", "e131"):
+            raise ValueError("protocol must be 'ddp' or 'e131'")
+        self.pixels = pixels
+        self.protocol = protocol
+        self.late_after = late_after
+        bpp = pixels.frame.shape[1]
+        self._frame = pixels.frame.reshape(-1)
+        self._base = pixel_offset * bpp
+        if not 0 <= self._base < self._frame.size:
+            raise ValueError("pixel_offset must be within the strip")
+
+        # One receive buffer for every datagram, and a NumPy view of it
+        self._buffer = bytearray(2048)
+        self._packet = np.frombuffer(self._buffer, dtype=np.uint8)
+        self._views = {}  # (frame start, packet start, count) -> (frame view, packet view)
+
+        # E1.31 universe -> (frame start, channels)
+        channels = channels_per_universe or default_channels_per_universe(bpp)
+        if not 0 < channels <= 512:
+            raise ValueError("channels_per_universe must be 1..512")
+        self.universes = {}
+        for index, start in enumerate(range(self._base, self._frame.size, channels)):
+            self.universes[universe + index] = (start, min(channels, self._frame.size - start))
+        self._last_universe = max(self.universes)
+
+        self.packets = 0  # datagrams received
+        self.frames = 0  # frames committed to the strip
+        self.lost = 0  # packets missing by sequence number
+        self.out_of_order = 0  # packets behind the sequence, discarded
+        self.frames_lost = 0  # E1.31 frames overwritten by the next before their sync came
+        self.late = 0  # frames committed after late_after
+        self.ignored = 0  # malformed, unmapped, preview or query packets
+        self.latency = RollingHistogram(window)  # first packet received -> frame shown
+        self.end_to_end = RollingHistogram(window)  # sender timecode -> frame shown
+        self._pending_since = None  # receive time of the first packet of the frame
+        self._timecode = None
+        self._ddp_sequence = 0
+        self._sequences = {}  # E1.31 universe -> last sequence number
+        self._sync_sequences = {}  # E1.31 sync address -> last sequence number
+        self._sync_address = None
+        self._pending_universes = set()  # universes received for the frame awaiting its sync
+        self._running = False
+        self._started = time.monotonic()
+
+        if port is None:
+            port = DDP_PORT if protocol == "ddp" else E131_PORT
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER_BYTES)
+        self.sock.bind((host, port))
+        self.address = self.sock.getsockname()
+        if multicast and protocol == "e131":
+            for number in self.universes:
+                group = socket.inet_aton(e131_multicast_group(number)) + socket.inet_aton("0.0.0.0")
+                self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, group)
+
+    def serve(self, duration=None, stats_interval=None):
+        """Receive and show frames until stop() is called or ``duration`` seconds pass.
+
+        :param float stats_interval: Print report() this often, in seconds.
+        """
+        handle = self._handle_ddp if self.protocol == "ddp" else self._handle_e131
+        recv_into = self.sock.recv_into
+        buffer = self._buffer
+        now = time.monotonic()
+        end = None if duration is None else now + duration
+        next_dump = None if stats_interval is None else now + stats_interval
+        self.sock.settimeout(0.25)  # wake up to check stop() and the clock
+        self._running = True
+        try:
+            while self._running:
+                try:
+                    size = recv_into(buffer)
+                except socket.timeout:
+                    size = 0
+                if size:
+                    self.packets += 1
+                    handle(size, time.perf_counter())
+                if end is not None or next_dump is not None:
+                    now = time.monotonic()
+                    if end is not None and now >= end:
+                        break
+                    if next_dump is not None and now >= next_dump:
+                        print(self.report())
+                        next_dump += stats_interval
+        finally:
+            self._running = False
+
+    def stop(self):
+        """Ask serve() to return (within its 0.25 s receive timeout)."""
+        self._running = False
+
+    def close(self):
+        self.sock.close()
+
+    # --- Packet handling ---
+    def _handle_ddp(self, size, received):
+        buffer = self._buffer
+        if size < DDP_HEADER.size:
+            self.ignored += 1
+            return
+        flags, sequence, _, device, offset, length = DDP_HEADER.unpack_from(buffer)
+        if flags & 0xC0 != DDP_VERSION or flags & (DDP_QUERY | DDP_REPLY) or device not in DDP_DEVICES:
+            self.ignored += 1
+            return
+        start = DDP_HEADER.size
+        timecode = None
+        if flags & DDP_TIMECODE_FLAG:
+            timecode = DDP_TIMECODE.unpack_from(buffer, start)[0]
+            start += DDP_TIMECODE.size
+        # Sequence numbers run 1..15; 0 means the sender doesn't number packets
+        if sequence:
+            if self._ddp_sequence:
+                gap = (sequence - self._ddp_sequence) % 15
+                if gap == 0 or gap > 7:
+                    self.out_of_order += 1
+                    return
+                self.lost += gap - 1
+            self._ddp_sequence = sequence
+        length = min(length, size - start)
+        if length > 0 and not self._copy(self._base + offset, start, length):
+            self.ignored += 1
+            return
+        if self._pending_since is None:
+            self._pending_since = received
+        if timecode is not None:
+            self._timecode = timecode
+        if flags & DDP_PUSH:
+            self._commit()
+
+    def _handle_e131(self, size, received):
+        buffer = self._buffer
+        if size < E131_SYNC_SIZE or not buffer.startswith(ACN_ID, 4):
+            self.ignored += 1
+            return
+        root_vector = _U32.unpack_from(buffer, 18)[0]
+        if root_vector == E131_ROOT_EXTENDED:
+            if _U32.unpack_from(buffer, 40)[0] != E131_EXTENDED_SYNC:
+                self.ignored += 1  # e.g. universe discovery
+                return
+            address = _U16.unpack_from(buffer, 45)[0]
+            if not self._check_sequence(self._sync_sequences, address, buffer[44]):
+                return
+            if self._pending_since is not None and address == self._sync_address:
+                self._commit()
+            return
+        if root_vector != E131_ROOT_DATA or size <= E131_DATA_OFFSET:
+            self.ignored += 1
+            return
+        sync_address, sequence, options, universe = E131_FRAMING.unpack_from(buffer, 109)
+        span = self.universes.get(universe)
+        if span is None or options & (E131_PREVIEW | E131_TERMINATED) or buffer[125] != 0:
+            self.ignored += 1  # not ours, not live, or not a DMX start code
+            return
+        if not self._check_sequence(self._sequences, universe, sequence):
+            return
+        if sync_address:
+            if universe in self._pending_universes:
+                # Data for the next frame before the sync for this one: it never came
+                self.frames_lost += 1
+                self._pending_universes.clear()
+                self._pending_since = None
+            self._pending_universes.add(universe)
+        count = min(_U16.unpack_from(buffer, 123)[0] - 1, size - E131_DATA_OFFSET, span[1])
+        if count > 0:
+            self._copy(span[0], E131_DATA_OFFSET, count)
+        if self._pending_since is None:
+            self._pending_since = received
+        if sync_address:
+            self._sync_address = sync_address
+        elif universe == self._last_universe:
+            self._commit()
+
+    def _check_sequence(self, sequences, key, sequence):
+        """Count packets skipped in ``key``'s sequence; False if this one is out of order."""
+        # E1.31 6.7.2: a sequence number up to 20 behind the last is out of order
+        last = sequences.get(key)
+        if last is not None:
+            gap = (sequence - last) & 0xFF
+            if gap == 0 or gap > 236:
+                self.out_of_order += 1
+                return False
+            self.lost += gap - 1
+        sequences[key] = sequence
+        return True
+
+    def _copy(self, start, source, count):
+        """Copy ``count`` packet bytes from ``source`` into the frame at ``start``."""
+        key = (start, source, count)
+        views = self._views.get(key)
+        if views is None:
+            count = min(count, self._frame.size - start)
+            if start < 0 or count <= 0:
+                return False
+            if len(self._views) >= 256:
+                self._views.clear()
+            views = self._views[key] = (self._frame[start : start + count],
+                                        self._packet[source : source + count])
+        np.copyto(*views)
+        return True
+
+    def _commit(self):
+        self.pixels.show()
+        latency = time.perf_counter() - self._pending_since
+        self.latency.add(latency)
+        if self._timecode is not None:
+            age = timecode_age(self._timecode)
+            if age is not None:
+                self.end_to_end.add(age)
+                latency = age
+            self._timecode = None
+        if latency > self.late_after:
+            self.late += 1
+        self.frames += 1
+        self._pending_since = None
+        self._pending_universes.clear()
+
+    # --- Reporting ---
+    def stats(self):
+        """Counters and latency summaries as a dict."""
+        elapsed = time.monotonic() - self._started
+        return {
+            "elapsed_s": elapsed,
+            "packets": self.packets,
+            "frames": self.frames,
+            "fps": self.frames / elapsed if elapsed > 0 else 0.0,
+            "lost": self.lost,
+            "out_of_order": self.out_of_order,
+            "frames_lost": self.frames_lost,
+            "late": self.late,
+            "ignored": self.ignored,
+            "latency": self.latency.summary(),
+            "end_to_end": self.end_to_end.summary(),
+        }
+
+    def report(self):
+        """Multi-line summary of stats() for printing."""
+        s = self.stats()
+        lines = [
+            f"{s['frames']} frames ({s['fps']:.1f}/s) from {s['packets']} packets in "
+            f"{s['elapsed_s']:.1f}s: {s['lost']} lost, {s['out_of_order']} out of order, "
+            f"{s['frames_lost']} frames missing their sync, {s['late']} late, {s['ignored']} ignored"
+        ]
+        for name in ("latency", "end_to_end"):
+            t = s[name]
+            if t["count"]:
+                lines.append(
+                    f"  {name:<10} n={t['count']:<7} mean {t['mean']:.3f}  p50 {t['p50']:.3f}  "
+                    f"p95 {t['p95']:.3f}  p99 {t['p99']:.3f}  max {t['max']:.3f} ms"
+                )
+        return "\n".join(lines)
+
+
+class FrameSender:
+    """Send R, G, B[, W] frames as DDP or E1.31 packets, e.g. to a NetworkReceiver.
+
+    Every packet is built once; sending a frame only updates sequence
+    numbers and the timecode and copies the pixel data in. DDP packets
+    carry a timecode for end-to-end latency.
+
+    :param int sync: E1.31 sync address (0 = commit on the last universe).
+    :param float drop: Fraction of packets to skip (without reusing their
+                       sequence numbers), to exercise loss reporting.
+    """
+
+    def __init__(self, size, bpp=3, protocol="ddp", host="127.0.0.1", port=None, universe=1,
+                 channels_per_universe=None, sync=0, multicast=False, drop=0.0):
+        if protocol not in ("ddp", "e131"):
+            raise ValueError("protocol must be 'ddp' or 'e131'")
+        if port is None:
+            port = DDP_PORT if protocol == "ddp" else E131_PORT
+        self.protocol = protocol
+        self.frame_bytes = size * bpp
+        self.drop = drop
+        self.frames = 0
+        self.packets = 0
+        self.dropped = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._packets = []  # (buffer, array view of its data, frame start, destination)
+        self._sequence = 0
+        self._sync_packet = None
+        if protocol == "ddp":
+            header = DDP_HEADER.size + DDP_TIMECODE.size
+            for start in range(0, self.frame_bytes, DDP_MAX_DATA):
+                count = min(DDP_MAX_DATA, self.frame_bytes - start)
+                packet = bytearray(header + count)
+                flags = DDP_VERSION | DDP_TIMECODE_FLAG
+                if start + count == self.frame_bytes:
+                    flags |= DDP_PUSH
+                DDP_HEADER.pack_into(packet, 0, flags, 0, DDP_DATA_RGB8, DDP_DEVICES[0], start, count)
+                self._add_packet(packet, header, start, count, (host, port))
+        else:
+            import uuid
+
+            cid = uuid.uuid4().bytes
+            channels = channels_per_universe or default_channels_per_universe(bpp)
+            for index, start in enumerate(range(0, self.frame_bytes, channels)):
+                count = min(channels, self.frame_bytes - start)
+                number = universe + index
+                packet = self._e131_data_packet(cid, number, count, sync)
+                target = (e131_multicast_group(number) if multicast else host, port)
+                self._add_packet(packet, E131_DATA_OFFSET, start, count, target)
+            if sync:
+                self._sync_packet = self._e131_sync_packet(cid, sync)
+                self._sync_target = (e131_multicast_group(sync) if multicast else host, port)
+
+    def _add_packet(self, packet, header, start, count, target):
+        view = np.frombuffer(packet, dtype=np.uint8)[header : header + count]
+        self._packets.append((packet, view, start, target))
+
+    @staticmethod
+    def _e131_data_packet(cid, universe, count, sync):
+        packet = bytearray(E131_DATA_OFFSET + count)
+        size = len(packet)
+        struct.pack_into(">HH12sHI16s", packet, 0, 0x0010, 0, ACN_ID, 0x7000 | (size - 16),
+                         E131_ROOT_DATA, cid)
+        struct.pack_into(">HI64sB", packet, 38, 0x7000 | (size - 38), E131_FRAMING_DATA,
+                         b"net_ingest test sender", 100)
+        E131_FRAMING.pack_into(packet, 109, sync, 0, 0, universe)
+        struct.pack_into(">HBBHHHB", packet, 115, 0x7000 | (size - 115), 0x02, 0xA1, 0, 1, count + 1, 0)
+        return packet
+
+    @staticmethod
+    def _e131_sync_packet(cid, sync):
+        packet = bytearray(E131_SYNC_SIZE)
+        struct.pack_into(">HH12sHI16s", packet, 0, 0x0010, 0, ACN_ID, 0x7000 | (E131_SYNC_SIZE - 16),
+                         E131_ROOT_EXTENDED, cid)
+        struct.pack_into(">HIBHH", packet, 38, 0x7000 | (E131_SYNC_SIZE - 38), E131_EXTENDED_SYNC, 0,
+                         sync, 0)
+        return packet
+
+    def send(self, frame):
+        """Send one frame: ``size * bpp`` bytes (or a C-contiguous uint8 array) of R, G, B[, W]."""
+        flat = np.frombuffer(frame, dtype=np.uint8)
+        if flat.size != self.frame_bytes:
+            raise ValueError(f"Expected {self.frame_bytes} bytes, got {flat.size}")
+        ddp = self.protocol == "ddp"
+        if ddp:
+            timecode = timecode_now()
+        for packet, view, start, target in self._packets:
+            np.copyto(view, flat[start : start + view.size])
+            if ddp:
+                self._sequence = self._sequence % 15 + 1
+                packet[1] = self._sequence
+                DDP_TIMECODE.pack_into(packet, DDP_HEADER.size, timecode)
+            else:
+                packet[111] = (packet[111] + 1) & 0xFF
+            self._sendto(packet, target)
+        if self._sync_packet is not None:
+            self._sync_packet[44] = (self._sync_packet[44] + 1) & 0xFF
+            self._sendto(self._sync_packet, self._sync_target)
+        self.frames += 1
+
+    def _sendto(self, packet, target):
+        if self.drop and np.random.random() < self.drop:
+            self.dropped += 1
+            return
+        self.sock.sendto(packet, target)
+        self.packets += 1
+
+    def close(self):
+        self.sock.close()
+
+
+# --- Command line ---
+def _receive_main(args):
+    from led_backends import backend_from_spec, spec_needs_pin
+    from pi5_pixelbuf import Pi5Pixelbuf
+
+    pin = None
+    if spec_needs_pin(args.backend):
+        import board
+
+        pin = getattr(board, args.pin)
+    pixels = Pi5Pixelbuf(pin, args.pixels, auto_write=False, byteorder=args.byteorder,
+                         brightness=args.brightness, async_transmit=args.async_transmit,
+                         backend=backend_from_spec(args.backend, pin))
+    receiver = NetworkReceiver(pixels, protocol=args.protocol, port=args.port, universe=args.universe,
+                               multicast=args.multicast, late_after=args.late_ms / 1000)
+    print(f"Receiving {args.protocol} on {receiver.address[0]}:{receiver.address[1]} "
+          f"for {args.pixels} pixels (Ctrl+C to stop)...")
+    try:
+        receiver.serve(duration=args.seconds, stats_interval=args.stats or None)
+    except KeyboardInterrupt:
+        print("\nInterrupted by user.")
+    finally:
+        receiver.close()
+        # Clear the strip like the other scripts do on exit
+        pixels.fill(0)
+        pixels.show()
+        pixels.close()
+        print(receiver.report())
+
+
+def _send_main(args):
+    bpp = len(args.channels)
+    sender = FrameSender(args.pixels, bpp=bpp, protocol=args.protocol, host=args.host, port=args.port,
+                         universe=args.universe, sync=args.sync, multicast=args.multicast, drop=args.drop)
+    # Test pattern: a colour ramp along the strip that scrolls one step a frame
+    frame = np.zeros((args.pixels, bpp), dtype=np.uint8)
+    ramp = (np.arange(args.pixels)[:, np.newaxis] * 4 + np.array([0, 85, 170])) % 256
+    period = 1 / args.fps
+    deadline = time.monotonic()
+    end = deadline + args.seconds
+    print(f"Sending {args.protocol} to {args.host} at {args.fps:g} fps for {args.seconds:g}s...")
+    try:
+        while deadline < end:
+            frame[:, :3] = (ramp + sender.frames) % 256
+            sender.send(frame)
+            deadline += period
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+    except KeyboardInterrupt:
+        print("\nInterrupted by user.")
+    finally:
+        sender.close()
+        print(f"Sent {sender.frames} frames in {sender.packets} packets ({sender.dropped} dropped on purpose)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DDP / E1.31 pixel ingest and test sender")
+    commands = parser.add_subparsers(dest="command", required=True)
+    receive = commands.add_parser("receive", help="show received frames on a strip or backend")
+    send = commands.add_parser("send", help="send a scrolling test pattern")
+    for command in (receive, send):
+        command.add_argument("--protocol", choices=("ddp", "e131"), default="ddp")
+        command.add_argument("--port", type=int, help="UDP port (default 4048 for DDP, 5568 for E1.31)")
+        command.add_argument("--pixels", type=int, default=96)
+        command.add_argument("--universe", type=int, default=1, help="first E1.31 universe")
+        command.add_argument("--multicast", action="store_true", help="use E1.31 multicast groups")
+    receive.add_argument("--backend", default="null",
+                         help="LED backend spec, as LED_BACKEND in sample2.py (default null)")
+    receive.add_argument("--pin", default="D18", help="board pin name (default D18)")
+    receive.add_argument("--byteorder", default="BGR")
+    receive.add_argument("--brightness", type=float, default=0.5)
+    receive.add_argument("--async-transmit", action="store_true", help="send frames from a thread")
+    receive.add_argument("--late-ms", type=float, default=25.0, help="latency that counts a frame late")
+    receive.add_argument("--seconds", type=float, help="stop after this long")
+    receive.add_argument("--stats", type=float, default=0, help="print stats every N seconds")
+    send.add_argument("--host", default="127.0.0.1")
+    send.add_argument("--channels", default="RGB", choices=("RGB", "RGBW"), help="channels per pixel")
+    send.add_argument("--fps", type=float, default=40.0)
+    send.add_argument("--seconds", type=float, default=10.0)
+    send.add_argument("--sync", type=int, default=0, help="E1.31 sync address (0 = none)")
+    send.add_argument("--drop", type=float, default=0.0, help="fraction of packets to skip")
+    args = parser.parse_args()
+    if args.command == "receive":
+        _receive_main(args)
+    else:
+        _send_main(args)
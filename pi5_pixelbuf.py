@@ -0,0 +1,531 @@
+"""Raspberry Pi 5 PixelBuf driver shared by the LED scripts."""
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import adafruit_pixelbuf
+
+from led_backends import NeopixelWriteBackend, NullSink
+
+
+class _TransmitWorker:
+    """Background thread that sends queued wire buffers and hands them back.
+
+    ``depth`` frames may wait in the queue while one is on the wire, so the
+    pool holds ``depth + 2`` buffers: those plus the back buffer being
+    converted. Buffers only ever move between the two queues, never copied.
+    """
+
+    def __init__(self, transmit, buffers, depth):
+        self._transmit = transmit
+        self._pending = queue.Queue(maxsize=depth)
+        self._free = queue.Queue()
+        for buf in buffers:
+            self._free.put(buf)
+        self.error = None
+        self.frames = 0
+        self.queue_max = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.wire_sum = 0.0
+        self.wait_sum = 0.0
+        self._thread = threading.Thread(target=self._run, name="pixelbuf-transmit", daemon=True)
+        self._thread.start()
+
+    def acquire(self):
+        """Block until a free buffer is available (backpressure) and return it."""
+        start = time.perf_counter()
+        buf = self._free.get()
+        self.wait_sum += time.perf_counter() - start
+        return buf
+
+    def submit(self, buf):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        self._pending.put((buf, time.perf_counter()))
+        depth = self._pending.qsize()
+        if depth > self.queue_max:
+            self.queue_max = depth
+
+    def flush(self):
+        """Wait until every submitted frame is on the wire."""
+        self._pending.join()
+
+    def close(self):
+        self.flush()
+        self._pending.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._pending.get()
+            try:
+                if item is None:
+                    return
+                buf, queued_at = item
+                start = time.perf_counter()
+                try:
+                    self._transmit(buf[0])
+                except Exception as e:  # surfaced on the next submit()
+                    self.error = e
+                done = time.perf_counter()
+                self.frames += 1
+                self.wire_sum += done - start
+                self.latency_sum += done - queued_at
+                self.latency_max = max(self.latency_max, done - queued_at)
+                self._free.put(buf)
+            finally:
+                self._pending.task_done()
+
+
+class Pi5Pixelbuf(adafruit_pixelbuf.PixelBuf):
+    """PixelBuf for the Pi 5 backed by a logical RGB(W) framebuffer.
+
+    Pixel writes (``pixels[i] = ...``, ``fill()``) only store the colour in
+    ``frame``, one row per pixel with channels in R, G, B[, W] order.
+    Brightness, optional gamma and byteorder are applied to the whole strip
+    at once when the frame is sent with ``show()`` or ``commit()``: one
+    vectorized gather permutes the channels and a 256-entry lookup table
+    scales them, straight into the preallocated wire buffer. The table and
+    the gather indices are only rebuilt when brightness, gamma or byteorder
+    change.
+
+    Wrap a draw in ``with pixels.batch():`` to defer every ``show()`` (and
+    auto_write) until the block ends, and a frame that is byte-identical to
+    the last one sent is not transmitted again.
+
+    With ``async_transmit=True`` a dedicated thread runs ``neopixel_write``
+    while the next frame is rendered. Frames are converted into a back
+    buffer that is swapped with a free one on ``show()``; at most
+    ``queue_depth`` frames wait for the wire before ``show()`` blocks. Call
+    ``close()`` (or ``flush()``) before exit so queued frames are sent.
+
+    :param float gamma: Gamma exponent applied before brightness (None = linear).
+    :param bool skip_duplicates: Skip the wire write when the frame is unchanged.
+    :param bool async_transmit: Send frames from a background thread.
+    :param int queue_depth: Frames allowed to wait for the transmit thread.
+    :param frame_buffer: Writable buffer of ``size * bpp`` bytes to use as the
+                         logical frame instead of allocating one (lets several
+                         strips share one frame, see MultiPixelbuf).
+    :param backend: Where frames go (see led_backends). Defaults to
+                    ``neopixel_write`` on ``pin``; pass e.g. a NullSink,
+                    MemorySink or FrameRecorder to run without hardware.
+    :param stats: A frame_stats.FrameStats to time conversion and transmit
+                  into (None = no timing). Can also be set later through the
+                  ``stats`` attribute.
+    """
+
+    def __init__(self, pin, size, gamma=None, skip_duplicates=True,
+                 async_transmit=False, queue_depth=1, frame_buffer=None, backend=None,
+                 stats=None, **kwargs):
+        self._pin = pin
+        self.backend = NeopixelWriteBackend(pin) if backend is None else backend
+        self._gamma = gamma
+        self._lut = None
+        self._batch_depth = 0
+        self._batch_pending = False
+        self._last_sent = None
+        self.skip_duplicates = skip_duplicates
+        self.stats = stats
+        self.frames_sent = 0
+        """Number of frames written to the wire."""
+        self.frames_skipped = 0
+        """Number of frames not sent because they matched the last one sent."""
+        self.shows_deferred = 0
+        """Number of show() calls folded into a batch."""
+        super().__init__(size=size, **kwargs)
+        if self._dotstar_mode:
+            raise ValueError("Pi5Pixelbuf only drives NeoPixel byteorders (no 'P')")
+
+        # Logical frame: a bytearray so per-pixel writes stay cheap, and a
+        # NumPy view of the same memory for whole-frame access
+        if frame_buffer is None:
+            frame_buffer = bytearray(size * self._bpp)
+        elif len(frame_buffer) != size * self._bpp:
+            raise ValueError(f"frame_buffer must be {size * self._bpp} bytes")
+        self._frame_buffer = frame_buffer
+        self._frame = np.frombuffer(self._frame_buffer, dtype=np.uint8).reshape(size, self._bpp)
+
+        # Conversion stage: frame -> (gather) -> _permuted -> (LUT) -> wire.
+        # np.take wants intp indices; casting into _indices avoids a
+        # per-frame temporary for the LUT lookup.
+        self._frame_flat = self._frame.reshape(-1)
+        self._permuted = np.empty(self._bytes, dtype=np.uint8)
+        self._indices = np.empty(self._bytes, dtype=np.intp)
+        self._wire = self._wire_view(self._post_brightness_buffer)
+        self._build_gather()
+        self._build_lut()
+
+        self._worker = None
+        if async_transmit:
+            if queue_depth < 1:
+                raise ValueError("queue_depth must be at least 1")
+            spares = []
+            for _ in range(queue_depth + 1):
+                buf = bytearray(self._post_brightness_buffer)
+                spares.append((buf, self._wire_view(buf)))
+            self._worker = _TransmitWorker(self._transmit, spares, queue_depth)
+        self._last_worker = self._worker
+
+    @property
+    def frame(self):
+        """Writable (pixels, bpp) uint8 view of the logical RGB(W) frame.
+
+        Write whole frames into it and call ``commit()``; no per-pixel calls
+        or conversions happen until then. ``memoryview(pixels.frame)`` gives
+        the same memory as a plain buffer.
+        """
+        return self._frame
+
+    def commit(self):
+        """Convert ``frame`` (brightness and byteorder) and transmit it."""
+        return self.show()
+
+    @contextmanager
+    def batch(self):
+        """Defer transmission until the block ends, then send at most once.
+
+        Batches may be nested; only the outermost one transmits.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._batch_pending:
+                self._batch_pending = False
+                self.show()
+
+    def flush(self):
+        """Block until every frame handed to the transmit thread is sent."""
+        if self._worker is not None:
+            self._worker.flush()
+
+    def close(self):
+        """Send any queued frames, stop the transmit thread and close the backend.
+
+        transmit_stats() keeps reporting the thread's figures afterwards.
+        """
+        if self._worker is not None:
+            self._worker.close()
+            self._worker = None
+        self.backend.close()
+
+    def transmit_stats(self):
+        """Latency figures for async_transmit mode (None when synchronous).
+
+        ``latency`` runs from show() queuing a frame until it is on the wire,
+        ``wire`` is the neopixel_write time alone and ``render_wait`` is how
+        long show() blocked for a free buffer.
+        """
+        worker = self._last_worker
+        if worker is None:
+            return None
+        frames = worker.frames or 1
+        return {
+            "frames": worker.frames,
+            "queue_depth": worker._pending.maxsize,
+            "queue_max": worker.queue_max,
+            "latency_mean_ms": worker.latency_sum / frames * 1000,
+            "latency_max_ms": worker.latency_max * 1000,
+            "wire_mean_ms": worker.wire_sum / frames * 1000,
+            "render_wait_ms": worker.wait_sum * 1000,
+        }
+
+    def reset_counters(self):
+        """Zero frames_sent, frames_skipped and shows_deferred."""
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.shows_deferred = 0
+
+    def invalidate(self):
+        """Forget the last frame sent, so the next show() transmits even if unchanged.
+
+        Call after writing to the strip behind the driver's back (e.g. a raw
+        ``neopixel_write``), which duplicate suppression cannot see.
+        """
+        self._last_sent = None
+
+    @property
+    def brightness(self):
+        """Float value between 0 and 1. Applied to the frame on every show()."""
+        return self._brightness
+
+    @brightness.setter
+    def brightness(self, value):
+        value = min(max(value, 0.0), 1.0)
+        if value == self._brightness:
+            return
+        self._brightness = value
+        if self._lut is not None:
+            self._build_lut()
+        if self.auto_write:
+            self.show()
+
+    @property
+    def gamma(self):
+        """Gamma exponent applied before brightness, or None for linear output."""
+        return self._gamma
+
+    @gamma.setter
+    def gamma(self, value):
+        self._gamma = value
+        self._build_lut()
+        if self.auto_write:
+            self.show()
+
+    @property
+    def byteorder(self):
+        """ByteOrder string for the buffer. May be changed to one of the same length."""
+        return self._byteorder_string
+
+    @byteorder.setter
+    def byteorder(self, value):
+        bpp, byteorder_tuple, has_white, dotstar_mode = self.parse_byteorder(value)
+        if bpp != self._bpp or dotstar_mode:
+            raise ValueError(f"Byteorder must be a {self._bpp}-channel NeoPixel order")
+        self._byteorder = byteorder_tuple
+        self._byteorder_string = value
+        self._has_white = has_white
+        self._build_gather()
+        if self.auto_write:
+            self.show()
+
+    def _build_lut(self):
+        # Same arithmetic as adafruit_pixelbuf: int(value * brightness)
+        if self._gamma is None:
+            levels = range(256)
+        else:
+            levels = [round(255 * (v / 255) ** self._gamma) for v in range(256)]
+        self._lut = np.array([int(v * self._brightness) for v in levels], dtype=np.uint8)
+
+    def _wire_view(self, buf):
+        return np.frombuffer(buf, dtype=np.uint8, count=self._bytes, offset=self._offset)
+
+    def _build_gather(self):
+        # Wire byte k of every pixel comes from logical channel source[k]
+        source = [0] * self._bpp
+        for channel, position in enumerate(self._byteorder):
+            source[position] = channel
+        pixel_starts = np.arange(self._pixels, dtype=np.intp)[:, np.newaxis] * self._bpp
+        self._gather = (pixel_starts + np.array(source, dtype=np.intp)).reshape(-1)
+
+    def show(self):
+        if self._batch_depth:
+            self._batch_pending = True
+            self.shows_deferred += 1
+            return None
+        return self._send_frame()
+
+    def show_wire(self, data):
+        """Send a frame that is already in this strip's byteorder.
+
+        ``data`` is ``len(pixels) * bpp`` bytes of unscaled colour, e.g. a
+        baked frame straight out of a memory map. Brightness and gamma are
+        still applied on the way into the transmit buffer; ``frame`` is left
+        untouched. Not deferred by batch().
+        """
+        if len(data) != self._bytes:
+            raise ValueError(f"Expected {self._bytes} bytes, got {len(data)}")
+        return self._send_frame(data)
+
+    def _send_frame(self, wire_frame=None):
+        stats = self.stats
+        if stats is not None:
+            start = time.perf_counter()
+        if wire_frame is None:
+            # mode="clip" lets np.take write straight into out without buffering
+            np.take(self._frame_flat, self._gather, out=self._permuted, mode="clip")
+            np.copyto(self._indices, self._permuted)
+        else:
+            np.copyto(self._indices, np.frombuffer(wire_frame, dtype=np.uint8))
+        np.take(self._lut, self._indices, out=self._wire, mode="clip")
+        if stats is not None:
+            stats.convert.add(time.perf_counter() - start)
+
+        buf = self._post_brightness_buffer
+        if self.skip_duplicates and buf == self._last_sent:
+            self.frames_skipped += 1
+            if stats is not None:
+                stats.frames_skipped += 1
+                stats.send_seconds += time.perf_counter() - start
+            return None
+        if self._worker is None:
+            result = self._transmit(buf)
+            self._remember_sent(buf)
+        else:
+            # Hand the back buffer to the transmit thread and swap in a free one
+            result = None
+            self._remember_sent(buf)
+            self._worker.submit((buf, self._wire))
+            self._post_brightness_buffer, self._wire = self._worker.acquire()
+        self.frames_sent += 1
+        if stats is not None:
+            stats.send_seconds += time.perf_counter() - start
+        return result
+
+    def _remember_sent(self, buf):
+        if self._last_sent is None:
+            self._last_sent = bytearray(buf)
+        else:
+            self._last_sent[:] = buf
+
+    def fill(self, color):
+        self._frame[:] = self._parse_color(color)[: self._bpp]
+        if self.auto_write:
+            self.show()
+
+    def _set_item(self, index, r, g, b, w):
+        if index < 0:
+            index += self._pixels
+        if index >= self._pixels or index < 0:
+            raise IndexError
+        offset = index * self._bpp
+        buf = self._frame_buffer
+        buf[offset] = r
+        buf[offset + 1] = g
+        buf[offset + 2] = b
+        if self._bpp == 4:
+            buf[offset + 3] = w
+
+    def _getitem(self, index):
+        start = index * self._bpp
+        return list(self._frame_buffer[start : start + self._bpp])
+
+    def _transmit(self, buf):
+        stats = self.stats
+        if stats is None:
+            self.backend.write(buf)
+            return
+        start = time.perf_counter()
+        self.backend.write(buf)
+        stats.transmit.add(time.perf_counter() - start)
+        stats.frames += 1
+        stats.bytes += len(buf)
+
+
+class MultiPixelbuf(Pi5Pixelbuf):
+    """One logical strip spread over several data pins.
+
+    Each ``(pin, size)`` (or ``(pin, size, byteorder)``) output becomes a
+    Pi5Pixelbuf in ``strips`` whose frame is a slice of this object's frame,
+    in the order given, so writes through the usual PixelBuf API,
+    PixelSubset or AnimationGroup land on the right strip without copies.
+
+    ``show()`` (or ``show_wire()``, split per output) converts every strip
+    and hands all of them to their own
+    transmit threads at once, so the wire time per frame is that of the
+    longest strip rather than the total pixel count. Before a new frame
+    goes out, the previous one has finished on every pin, which keeps the
+    strips in step. Call ``close()`` before exit.
+
+    Other keyword arguments (byteorder, brightness, gamma, stats, ...)
+    apply to all strips; with stats, every output's write counts as a
+    frame. ``backend_factory(pin)``, if given, builds each strip's
+    backend.
+    """
+
+    def __init__(self, outputs, byteorder="BGR", skip_duplicates=True, backend_factory=None,
+                 **kwargs):
+        if not outputs:
+            raise ValueError("MultiPixelbuf needs at least one output")
+        bpp = self.parse_byteorder(byteorder)[0]
+        size = sum(output[1] for output in outputs)
+        frame_buffer = bytearray(size * bpp)
+        frame_memory = memoryview(frame_buffer)
+
+        # Every strip transmits from its own thread; the parent never does
+        kwargs.pop("async_transmit", None)
+        kwargs.pop("queue_depth", None)
+        child_kwargs = {k: v for k, v in kwargs.items() if k != "auto_write"}
+        self.strips = []
+        start = 0
+        for output in outputs:
+            pin, strip_size = output[0], output[1]
+            strip_order = output[2] if len(output) > 2 else byteorder
+            end = start + strip_size * bpp
+            self.strips.append(Pi5Pixelbuf(
+                pin,
+                strip_size,
+                byteorder=strip_order,
+                skip_duplicates=skip_duplicates,
+                async_transmit=True,
+                frame_buffer=frame_memory[start:end],
+                backend=None if backend_factory is None else backend_factory(pin),
+                **child_kwargs,
+            ))
+            start = end
+
+        # The parent only holds the shared frame; strips do the sending
+        super().__init__(
+            None, size, byteorder=byteorder, skip_duplicates=False,
+            frame_buffer=frame_buffer, backend=NullSink(), **kwargs
+        )
+
+    @property
+    def stats(self):
+        """FrameStats shared with every strip, or None."""
+        return self._stats
+
+    @stats.setter
+    def stats(self, value):
+        self._stats = value
+        for strip in self.strips:
+            strip.stats = value
+
+    @Pi5Pixelbuf.brightness.setter
+    def brightness(self, value):
+        for strip in getattr(self, "strips", ()):
+            strip.brightness = value
+        Pi5Pixelbuf.brightness.fset(self, value)
+
+    @Pi5Pixelbuf.gamma.setter
+    def gamma(self, value):
+        for strip in self.strips:
+            strip.gamma = value
+        Pi5Pixelbuf.gamma.fset(self, value)
+
+    def _send_frame(self, wire_frame=None):
+        # Synchronized commit: every pin has finished the previous frame
+        # before any of them starts on this one
+        for strip in self.strips:
+            strip.flush()
+        if wire_frame is None:
+            for strip in self.strips:
+                strip.show()
+        else:
+            for strip, data in zip(self.strips, self._split_wire(wire_frame)):
+                strip.show_wire(data)
+        self.frames_sent += 1
+
+    def _split_wire(self, wire_frame):
+        """Yield each strip's part of a frame in this object's byteorder, in the strip's."""
+        data = np.frombuffer(wire_frame, dtype=np.uint8)
+        logical = None
+        start = 0
+        for strip in self.strips:
+            end = start + strip._bytes
+            if strip.byteorder == self.byteorder:
+                yield data[start:end]
+            else:
+                if logical is None:
+                    # Undo this object's byteorder once, then apply the strip's
+                    logical = np.empty_like(data)
+                    logical[self._gather] = data
+                yield logical[start:end][strip._gather]
+            start = end
+
+    def flush(self):
+        for strip in self.strips:
+            strip.flush()
+
+    def close(self):
+        for strip in self.strips:
+            strip.close()
+
+    def transmit_stats(self):
+        """transmit_stats() of every strip, in output order."""
+        return [strip.transmit_stats() for strip in self.strips]
@@ -1,36 +1,48 @@
+import argparse
+import os
+import sys
 import time
-import board
-import adafruit_pixelbuf
-from adafruit_raspberry_pi5_neopixel_write import neopixel_write
+from pi5_pixelbuf import Pi5Pixelbuf
+from frame_stats import FrameStats, RollingHistogram
+from led_backends import MemorySink
+import startup
 
 # --- Configuration ---
-NEOPIXEL_PIN = board.D18  # Data pin
+NEOPIXEL_PIN = "D18"      # Data pin (name on board)
 NUM_PIXELS = 96           # Number of LEDs (adjust to your strip)
 BRIGHTNESS = 0.5          # 0.0 to 1.0
 # Set to 4 for RGBW strips, 3 for RGB strips
 BYTES_PER_PIXEL = 4
 # Default byteorder for PixelBuf (adjust after running 'order' test if needed)
 DEFAULT_BYTEORDER = "BGRW"
+# Time every frame from startup (can also be switched with 'stats on' / 'stats off')
+COLLECT_STATS = False
+# Time the cold start to the first lit frame with: python startup.py sample.py
 
+pixels = None  # The strip, opened on first use by get_pixels()
 
-# --- Raspberry Pi 5 Custom PixelBuf Driver ---
-class Pi5Pixelbuf(adafruit_pixelbuf.PixelBuf):
-    def __init__(self, pin, size, **kwargs):
-        self._pin = pin
-        super().__init__(size=size, **kwargs)
 
-    def _transmit(self, buf):
-        neopixel_write(self._pin, buf)
+def board_pin():
+    """The data pin; board is imported here so this module imports without the hardware."""
+    import board
 
+    return getattr(board, NEOPIXEL_PIN)
 
-# Initialize the pixel strip with manual writes so we control when updates happen
-pixels = Pi5Pixelbuf(
-    NEOPIXEL_PIN,
-    NUM_PIXELS,
-    auto_write=False,
-    byteorder=DEFAULT_BYTEORDER,
-    brightness=BRIGHTNESS,
-)
+
+def get_pixels():
+    """Return the strip, initialising it on first use."""
+    global pixels
+    if pixels is None:
+        # Manual writes so we control when updates happen
+        pixels = Pi5Pixelbuf(
+            board_pin(),
+            NUM_PIXELS,
+            auto_write=False,
+            byteorder=DEFAULT_BYTEORDER,
+            brightness=BRIGHTNESS,
+            stats=FrameStats() if COLLECT_STATS else None,
+        )
+    return pixels
 
 
 def light_single_led(one_based_index, color=None):
@@ -42,26 +54,32 @@ def light_single_led(one_based_index, color=None):
     if idx < 0 or idx >= NUM_PIXELS:
         raise ValueError("LED index out of range")
 
-    # Default color: for RGBW strips use white via the W channel
     if color is None:
-        if BYTES_PER_PIXEL == 4:
-            color = (0, 0, 0, 255)  # full white via W channel
-        else:
-            color = (255, 255, 255)
+        color = default_color()
 
+    pixels = get_pixels()
     # Clear all, set the requested LED, then transmit
     pixels.fill(0)
     pixels[idx] = color
     pixels.show()
 
 
+def default_color():
+    """White: via the W channel on RGBW strips, all three channels on RGB."""
+    if BYTES_PER_PIXEL == 4:
+        return (0, 0, 0, 255)  # full white via W channel
+    return (255, 255, 255)
+
+
 def interactive_console():
-    print(f"Interactive LED console — pin: D18, LEDs: {NUM_PIXELS}")
+    print(f"Interactive LED console — pin: {NEOPIXEL_PIN}, LEDs: {NUM_PIXELS}")
     print("Enter a number 1..{0} to light that LED, or 'q' to quit.".format(NUM_PIXELS))
 
     # Start with all LEDs off
+    pixels = get_pixels()
     pixels.fill(0)
     pixels.show()
+    startup.mark("first frame")
 
     current = None
     try:
@@ -78,12 +96,16 @@ def interactive_console():
                 continue
 
             if s.lower() in ("info", "i"):
-                print(f"Pin object: {NEOPIXEL_PIN} (type: {type(NEOPIXEL_PIN)})")
+                pin = board_pin()
+                print(f"Pin object: {pin} (type: {type(pin)})")
                 print(f"NUM_PIXELS={NUM_PIXELS}, auto_write={pixels.auto_write}")
                 continue
             if s.lower() in ("order", "o"):
                 test_byteorders()
                 continue
+            if s.lower().startswith("stats"):
+                stats_command(s.lower().split()[1:])
+                continue
 
             try:
                 n = int(s)
@@ -114,8 +136,35 @@ def interactive_console():
             print("Could not clear LEDs (hardware may be absent).")
 
 
+def stats_command(args):
+    """Handle 'stats' (show), 'stats on', 'stats off' and 'stats reset'."""
+    action = args[0] if args else "show"
+    pixels = get_pixels()
+    if action == "on":
+        if pixels.stats is None:
+            pixels.stats = FrameStats()
+        print("Frame timing enabled.")
+    elif action == "off":
+        pixels.stats = None
+        print("Frame timing disabled.")
+    elif action == "reset":
+        pixels.reset_counters()
+        if pixels.stats is not None:
+            pixels.stats.reset()
+        print("Stats reset.")
+    elif action == "show":
+        print(f"Frames sent: {pixels.frames_sent}, duplicates skipped: {pixels.frames_skipped}")
+        if pixels.stats is None:
+            print("Frame timing is off — enter 'stats on' to start collecting.")
+        else:
+            print(pixels.stats.report(histograms=True))
+    else:
+        print("Usage: stats [on|off|reset]")
+
+
 def run_hardware_test():
     """Attempt basic hardware writes and report any exceptions."""
+    pixels = get_pixels()
     print("Running hardware test: filling all LEDs white for 2 seconds...")
     try:
         # Try using PixelBuf API first
@@ -134,6 +183,8 @@ def run_hardware_test():
 
     # Try raw neopixel_write with a simple buffer
     try:
+        from adafruit_raspberry_pi5_neopixel_write import neopixel_write
+
         print("Attempting raw neopixel_write with white buffer...")
         # Build minimal raw buffer depending on pixel depth
         raw = bytearray()
@@ -143,10 +194,13 @@ def run_hardware_test():
         else:
             for _ in range(NUM_PIXELS):
                 raw += bytes((255, 255, 255))
-        neopixel_write(NEOPIXEL_PIN, raw)
+        neopixel_write(board_pin(), raw)
         print("neopixel_write(raw) succeeded.")
     except Exception as e:
         print(f"neopixel_write(raw) failed: {e}")
+    finally:
+        # The raw write bypassed the driver: don't let it skip the next frame as a duplicate
+        pixels.invalidate()
 
 
 def test_byteorders():
@@ -155,6 +209,10 @@ def test_byteorders():
     The function will send a red test pattern encoded for each candidate order and pause briefly.
     Observe which test shows a true red pixel; that's the correct byteorder for your strip.
     """
+    from adafruit_raspberry_pi5_neopixel_write import neopixel_write
+
+    pin = board_pin()
+
     def map_color_to_order(color, order):
         # Supports 3- or 4-letter orders (e.g. 'GRB' or 'GRBW')
         mapping = {}
@@ -184,13 +242,15 @@ def test_byteorders():
             pix_bytes = map_color_to_order(test_color, order)
             for _ in range(NUM_PIXELS):
                 raw += pix_bytes
-            neopixel_write(NEOPIXEL_PIN, raw)
+            neopixel_write(pin, raw)
             time.sleep(1.2)
             # clear quickly
-            neopixel_write(NEOPIXEL_PIN, bytearray([0]) * (NUM_PIXELS * BYTES_PER_PIXEL))
+            neopixel_write(pin, bytearray([0]) * (NUM_PIXELS * BYTES_PER_PIXEL))
             time.sleep(0.2)
         except Exception as e:
             print(f"Error writing test for {order}: {e}")
+    # The strip no longer shows the driver's last frame
+    get_pixels().invalidate()
 
     print("Byteorder tests finished. Use the ordering that displayed RED correctly.")
     print("If none looked correct, check wiring, ground, level shifter, and power supply.")
@@ -204,5 +264,198 @@ def test_byteorders():
     print("- If colors stay wrong or change when multiple LEDs are lit, suspect timing/signal integrity or power sag — verify with the 'test' command and a multimeter.")
 
 
+# --- Scripted addressing (batch mode) ---
+class SingleLedFrames:
+    """Cache of ready-to-send wire frames that each light one LED.
+
+    Frames go through a one-pixel Pi5Pixelbuf with the strip's byteorder
+    and brightness, so they are byte-for-byte what light_single_led() would
+    send. The default colour is built for every LED up front; other colours
+    are added on first use. Lookups are keyed by the raw command line, so a
+    repeated command costs one dict lookup.
+
+    :param int max_frames: Cached frames kept before the oldest are dropped.
+    """
+
+    def __init__(self, max_frames=4096):
+        self.max_frames = max_frames
+        self.blank = bytes(NUM_PIXELS * BYTES_PER_PIXEL)
+        self.hits = 0
+        self.misses = 0
+        self._pixel = Pi5Pixelbuf(None, 1, auto_write=False, byteorder=DEFAULT_BYTEORDER,
+                                  brightness=get_pixels().brightness, skip_duplicates=False,
+                                  backend=MemorySink())
+        self._by_color = {}
+        self._by_line = {}
+        for n in range(1, NUM_PIXELS + 1):
+            self.frame(n, default_color())
+
+    def frame(self, one_based_index, color):
+        """Wire frame with only LED ``one_based_index`` lit in ``color``."""
+        key = (one_based_index, tuple(color))
+        frame = self._by_color.get(key)
+        if frame is None:
+            self._pixel[0] = color
+            self._pixel.show()
+            raw = bytearray(self.blank)
+            offset = (one_based_index - 1) * BYTES_PER_PIXEL
+            raw[offset : offset + BYTES_PER_PIXEL] = self._pixel.backend.last_frame
+            frame = bytes(raw)
+            self._remember(self._by_color, key, frame)
+        return frame
+
+    def lookup(self, line):
+        """Wire frame for one command line (see parse_command()).
+
+        Raises ValueError for malformed commands.
+        """
+        frame = self._by_line.get(line)
+        if frame is not None:
+            self.hits += 1
+            return frame
+        self.misses += 1
+        index, color = parse_command(line)
+        frame = self.blank if index is None else self.frame(index, color)
+        self._remember(self._by_line, line, frame)
+        return frame
+
+    def _remember(self, cache, key, frame):
+        if len(cache) >= self.max_frames:
+            del cache[next(iter(cache))]  # oldest entry first
+        cache[key] = frame
+
+
+def parse_command(line):
+    """Parse one batch command into (1-based index or None, colour).
+
+    ``N`` lights LED N in the default colour, ``N R G B [W]`` or ``N #RRGGBB``
+    in that colour; ``0`` or ``clear`` turns everything off.
+    """
+    fields = line.split()
+    if not fields:
+        raise ValueError("empty command")
+    if fields[0].lower() in (b"clear", b"0"):
+        return None, None
+    n = int(fields[0])
+    if n < 1 or n > NUM_PIXELS:
+        raise ValueError(f"LED index out of range 1..{NUM_PIXELS}")
+    if len(fields) == 1:
+        return n, default_color()
+    if len(fields) == 2 and fields[1].startswith(b"#"):
+        value = int(fields[1][1:], 16)
+        return n, (value >> 16 & 0xFF, value >> 8 & 0xFF, value & 0xFF)
+    color = tuple(int(field) for field in fields[1:])
+    if len(color) not in (3, BYTES_PER_PIXEL) or not all(0 <= c <= 255 for c in color):
+        raise ValueError("colour must be R G B" + (" [W]" if BYTES_PER_PIXEL == 4 else "") + " in 0..255")
+    return n, color
+
+
+def _command_lines(source):
+    """Yield command lines (bytes) from stdin, a file/FIFO or a local socket."""
+    if source == "-":
+        yield from sys.stdin.buffer
+        return
+    if source.startswith(("unix:", "tcp:")):
+        import socket
+
+        kind, _, address = source.partition(":")
+        if kind == "unix":
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            address = ("127.0.0.1", int(address))
+        with server:
+            server.bind(address)
+            server.listen(1)
+            print(f"Waiting for commands on {source} (Ctrl+C to stop)...", file=sys.stderr)
+            # One client at a time; the next may connect when it hangs up
+            while True:
+                conn, _ = server.accept()
+                with conn, conn.makefile("rb") as stream:
+                    yield from stream
+    with open(source, "rb") as stream:
+        yield from stream
+
+
+def run_batch(source):
+    """Light LEDs from scripted commands as fast as they arrive.
+
+    Each command is answered with a cached wire frame passed straight to
+    the strip's write, skipping fill()/show(). Prints throughput and
+    per-command latency (line received to write returned) at the end.
+    """
+    frames = SingleLedFrames()
+    write = get_pixels().backend.write
+    startup.mark("batch ready")
+    latency = RollingHistogram(window=65536)
+    commands = errors = 0
+    start = time.perf_counter()
+    try:
+        for line in _command_lines(source):
+            received = time.perf_counter()
+            try:
+                frame = frames.lookup(line)
+            except ValueError as e:
+                errors += 1
+                print(f"Bad command {line.strip()!r}: {e}", file=sys.stderr)
+                continue
+            write(frame)
+            latency.add(time.perf_counter() - received)
+            commands += 1
+    except KeyboardInterrupt:
+        print("\nInterrupted by user.", file=sys.stderr)
+    finally:
+        elapsed = time.perf_counter() - start
+        write(frames.blank)
+        get_pixels().invalidate()  # frames went straight to the backend
+        if source.startswith("unix:"):
+            try:
+                os.unlink(source[5:])
+            except OSError:
+                pass
+        t = latency.summary()
+        print(f"Batch: {commands} commands in {elapsed:.2f}s ({commands / elapsed if elapsed else 0:.0f}/s), "
+              f"{errors} bad, cache {frames.hits} hits / {frames.misses} misses", file=sys.stderr)
+        print(f"Latency: mean {t['mean']:.3f}  p50 {t['p50']:.3f}  p99 {t['p99']:.3f}  max {t['max']:.3f} ms",
+              file=sys.stderr)
+
+
+# --- Network ingest ---
+def run_network(spec):
+    """Show DDP or E1.31 frames from the network (see net_ingest.py) until Ctrl+C.
+
+    ``spec`` is ``ddp`` or ``e131``, optionally with ``:PORT``.
+    """
+    from net_ingest import NetworkReceiver
+
+    protocol, _, port = spec.partition(":")
+    pixels = get_pixels()
+    receiver = NetworkReceiver(pixels, protocol=protocol, port=int(port) if port else None)
+    startup.mark("network ready")
+    print(f"Receiving {protocol} on port {receiver.address[1]} (Ctrl+C to stop)...", file=sys.stderr)
+    try:
+        receiver.serve()
+    except KeyboardInterrupt:
+        print("\nInterrupted by user.", file=sys.stderr)
+    finally:
+        receiver.close()
+        pixels.fill(0)
+        pixels.show()
+        print(receiver.report(), file=sys.stderr)
+
+
 if __name__ == "__main__":
-    interactive_console()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Single-LED console and scripted addressing")
+    parser.add_argument("--batch", metavar="SOURCE", nargs="?", const="-",
+                        help="read commands ('N', 'N R G B [W]', 'N #RRGGBB', 'clear') from "
+                             "stdin (-), a file or FIFO, unix:PATH or tcp:PORT (localhost)")
+    parser.add_argument("--net", metavar="PROTOCOL[:PORT]",
+                        help="show frames streamed over UDP as ddp (port 4048) or e131 (sACN, 5568)")
+    args = parser.parse_args()
+    if args.net is not None:
+        run_network(args.net)
+    elif args.batch is None:
+        interactive_console()
+    else:
+        run_batch(args.batch)
\ No newline at end of file
@@ -1,128 +1,208 @@
-import time
-import math
-import random
-import board
-import adafruit_pixelbuf
-from adafruit_raspberry_pi5_neopixel_write import neopixel_write
-
-# Standard Animation Imports
-from adafruit_led_animation.animation import Animation
-from adafruit_led_animation.sequence import AnimationSequence
-from adafruit_led_animation.group import AnimationGroup
-from adafruit_led_animation.helper import PixelSubset
-from adafruit_led_animation.color import (
-    RED, BLUE, PURPLE, JADE, GOLD, WHITE, BLACK, TEAL, MAGENTA
-)
-from adafruit_led_animation.animation.comet import Comet
-from adafruit_led_animation.animation.sparkle import Sparkle
+import os
+import startup
+
+# The driver, animation and numpy imports happen inside the functions that
+# use them, so importing this module (e.g. in the out-of-process parent)
+# stays cheap and the cold start only pays for what the chosen path needs
 
 # --- Configuration ---
-NEOPIXEL_PIN = board.D18
+NEOPIXEL_PIN = "D18"  # Pin name on board
 NUM_PIXELS = 96
+# Split long runs across several data pins, e.g. [("D18", 48), ("D12", 48)].
+# Pixels are numbered through the outputs in order. None = single strip on NEOPIXEL_PIN.
+STRIP_OUTPUTS = None
 BRIGHTNESS = 0.6  # Cranked up a bit (watch your PSU!)
+FRAME_RATE = 100  # Matches the fastest animation speed (0.01s)
+ASYNC_TRANSMIT = False  # Send frames from a background thread (helps long strips)
+# Where frames go: "neopixel" (the strip), "null", "wire", "memory", "record:FILE" or
+# "record-only:FILE" (replay with: python led_backends.py replay FILE)
+LED_BACKEND = os.environ.get("LED_BACKEND", "neopixel")
+# Seconds each effect takes to fade into the next (0 = hard cut)
+CROSSFADE_SECONDS = float(os.environ.get("LED_CROSSFADE", "1"))
+# Render the plasma loops once into a frame cache and stream them at show time
+BAKE_EFFECTS = os.environ.get("LED_BAKE", "0") == "1"
+# Print render/convert/transmit timings every N seconds (0 = off)
+STATS_INTERVAL = float(os.environ.get("LED_STATS", "0"))
+# Render in one worker process and transmit from another, via shared memory (see frame_ring.py)
+RENDER_PROCESS = os.environ.get("LED_PROCESS", "0") == "1"
+# Time the cold start to the first lit frame with: python startup.py sample2.py
+
+
+# --- HARDWARE DRIVER (Pi 5 Specific, see pi5_pixelbuf.py) ---
+def open_pixels(frame_stats=None):
+    """Open the strip. board is imported only for backends that drive a pin,
+    so e.g. LED_BACKEND=null runs without the hardware."""
+    from pi5_pixelbuf import Pi5Pixelbuf, MultiPixelbuf
+    from led_backends import backend_from_spec, spec_needs_pin
+
+    if spec_needs_pin(LED_BACKEND):
+        import board
+
+        def get_pin(name):
+            return getattr(board, name)
+    else:
+        def get_pin(name):
+            return None
+
+    if STRIP_OUTPUTS:
+        # One logical strip, all pins transmitted in parallel on each show()
+        # (each from its own thread, whatever ASYNC_TRANSMIT says)
+        outputs = [(get_pin(name), size) for name, size in STRIP_OUTPUTS]
+        names = iter(name for name, _ in STRIP_OUTPUTS)  # backends are built in output order
+
+        def backend_factory(pin):
+            return backend_from_spec(_output_spec(LED_BACKEND, next(names)), pin)
+
+        return MultiPixelbuf(outputs, auto_write=True, byteorder="BGR", brightness=BRIGHTNESS,
+                             backend_factory=backend_factory, stats=frame_stats)
+    pin = get_pin(NEOPIXEL_PIN)
+    return Pi5Pixelbuf(pin, NUM_PIXELS, auto_write=True, byteorder="BGR", brightness=BRIGHTNESS,
+                       async_transmit=ASYNC_TRANSMIT,
+                       backend=backend_from_spec(LED_BACKEND, pin),
+                       stats=frame_stats)
+
+
+def _output_spec(spec, name):
+    """The backend spec for one of several outputs: recordings get a file each."""
+    kind, _, path = spec.partition(":")
+    if not path:
+        return spec
+    root, ext = os.path.splitext(path)
+    return f"{kind}:{root}.{name}{ext}"
 
-# --- HARDWARE DRIVER (Pi 5 Specific) ---
-class Pi5Pixelbuf(adafruit_pixelbuf.PixelBuf):
-    def __init__(self, pin, size, **kwargs):
-        self._pin = pin
-        super().__init__(size=size, **kwargs)
-
-    def _transmit(self, buf):
-        neopixel_write(self._pin, buf)
-
-pixels = Pi5Pixelbuf(NEOPIXEL_PIN, NUM_PIXELS, auto_write=True, byteorder="BGR", brightness=BRIGHTNESS)
-
-# --- CUSTOM ANIMATION 1: LiquidNeon (Math-based Plasma) ---
-class LiquidNeon(Animation):
-    def __init__(self, pixel_object, speed, color_a, color_b, period=5):
-        super().__init__(pixel_object, speed, color_a)
-        self.color_a = color_a
-        self.color_b = color_b
-        self.period = period
-        self.offset = 0.0
-
-    def draw(self):
-        # Calculate a sine wave that moves over time
-        self.offset += 0.2
-        for i in range(len(self.pixel_object)):
-            # Create a wave based on pixel position and time
-            wave = math.sin(i * 0.2 + self.offset) + math.cos(i * 0.15 - self.offset)
-            # Map wave (-2 to 2) to a mix of color_a and color_b
-            mix = (wave + 2) / 4.0  # Normalize to 0.0 - 1.0
-            
-            # Manual color mixing (Linear Interpolation)
-            r = int(self.color_a[0] * mix + self.color_b[0] * (1 - mix))
-            g = int(self.color_a[1] * mix + self.color_b[1] * (1 - mix))
-            b = int(self.color_a[2] * mix + self.color_b[2] * (1 - mix))
-            
-            self.pixel_object[i] = (r, g, b)
-
-# --- CUSTOM ANIMATION 2: CyberGlitch (Randomized Corruption) ---
-class CyberGlitch(Animation):
-    def __init__(self, pixel_object, speed, color):
-        super().__init__(pixel_object, speed, color)
-        
-    def draw(self):
-        # 1. Randomly dim everything slightly (fade trail)
-        for i in range(len(self.pixel_object)):
-            current = self.pixel_object[i]
-            # Fast fade (bit shift or multiply)
-            self.pixel_object[i] = (int(current[0]*0.6), int(current[1]*0.6), int(current[2]*0.6))
-            
-        # 2. Inject random "glitches" (bright flashes)
-        num_glitches = random.randint(1, 4)
-        for _ in range(num_glitches):
-            idx = random.randint(0, len(self.pixel_object) - 1)
-            # Random bright color from a palette
-            glitch_color = random.choice([WHITE, self.color, RED, (0, 255, 0)])
-            self.pixel_object[idx] = glitch_color
 
 # --- EFFECT SETUP ---
-
-# 1. The "Collider" (Split Strip Logic)
-# We split the strip in half. One comet goes up, one goes down.
-half_point = NUM_PIXELS // 2
-left_strip = PixelSubset(pixels, 0, half_point)
-right_strip = PixelSubset(pixels, half_point, NUM_PIXELS)
-
-# Left side: Red Comet moving forward
-collider_left = Comet(left_strip, speed=0.02, color=RED, tail_length=15, bounce=True)
-# Right side: Blue Comet moving backward (reverse=True doesn't exist on Comet, so we use logic or bounce)
-# Actually, let's just use bounce on both for a "battle" look.
-collider_right = Comet(right_strip, speed=0.02, color=BLUE, tail_length=15, bounce=True)
-
-collision_event = AnimationGroup(collider_left, collider_right)
-
-# 2. The Liquid Neon Instance
-liquid_ooze = LiquidNeon(pixels, speed=0.01, color_a=PURPLE, color_b=TEAL)
-liquid_fire = LiquidNeon(pixels, speed=0.01, color_a=RED, color_b=GOLD)
-
-# 3. The Cyber Glitch Instance
-matrix_glitch = CyberGlitch(pixels, speed=0.03, color=JADE)
-
-# 4. High Speed Sparkle (Strobe)
-panic_mode = Sparkle(pixels, speed=0.01, color=WHITE, num_sparkles=20)
-
-# --- MASTER SEQUENCE ---
-animations = AnimationSequence(
-    liquid_ooze,        # 5 seconds of smooth purple/teal plasma
-    collision_event,    # 5 seconds of Red/Blue comets hitting each other
-    matrix_glitch,      # 5 seconds of digital rain/corruption
-    liquid_fire,        # 5 seconds of molten gold/red plasma
-    panic_mode,         # 5 seconds of intense white strobe
-    advance_interval=5,
-    auto_clear=True,
-    random_order=False
-)
-
-print("Starting EXTREME Animation Sequence...")
-print("Press Ctrl+C to stop.")
-
-try:
-    while True:
+# Every effect draws into its own layer of a Compositor, which blends the
+# visible layers and sends one frame per tick (see compositor.py)
+def build_sequence(pixels, bake_cache=None):
+    """The master sequence of effects for ``pixels``.
+
+    With LED_BAKE=1 the plasma loops stream from ``bake_cache`` (default:
+    bake_cache.py's shared cache); the caller closes it when done."""
+    from adafruit_led_animation.group import AnimationGroup
+    from adafruit_led_animation.helper import PixelSubset
+    from adafruit_led_animation.color import RED, BLUE, PURPLE, JADE, GOLD, WHITE, TEAL
+    from adafruit_led_animation.animation.comet import Comet
+    from adafruit_led_animation.animation.sparkle import Sparkle
+    from neon_animations import LiquidNeon, CyberGlitch
+    from compositor import Compositor, CrossfadeSequence
+
+    compositor = Compositor(pixels)
+
+    # 1. The "Collider" (Split Strip Logic)
+    # We split the strip in half. One comet goes up, one goes down.
+    def collider(layer):
+        half_point = len(layer) // 2
+        left_strip = PixelSubset(layer, 0, half_point)
+        right_strip = PixelSubset(layer, half_point, len(layer))
+
+        # Left side: Red Comet moving forward
+        collider_left = Comet(left_strip, speed=0.02, color=RED, tail_length=15, bounce=True)
+        # Right side: Blue Comet moving backward (reverse=True doesn't exist on Comet, so we use logic or bounce)
+        # Actually, let's just use bounce on both for a "battle" look.
+        collider_right = Comet(right_strip, speed=0.02, color=BLUE, tail_length=15, bounce=True)
+        # Both halves land in the layer; the compositor sends them as one frame
+        return AnimationGroup(collider_left, collider_right)
+
+    # 2. The Liquid Neon Instances
+    def liquid(color_a, color_b):
+        if BAKE_EFFECTS:
+            from bake_cache import BakedAnimation
+
+            return lambda layer: BakedAnimation.cached(layer, LiquidNeon, LiquidNeon.LOOP_FRAMES,
+                                                       cache=bake_cache, speed=0.01,
+                                                       color_a=color_a, color_b=color_b)
+        return lambda layer: LiquidNeon(layer, speed=0.01, color_a=color_a, color_b=color_b)
+
+    liquid_ooze = compositor.add_layer(liquid(PURPLE, TEAL))
+    collision_event = compositor.add_layer(collider)
+    # 3. The Cyber Glitch Instance
+    matrix_glitch = compositor.add_layer(lambda layer: CyberGlitch(layer, speed=0.03, color=JADE))
+    liquid_fire = compositor.add_layer(liquid(RED, GOLD))
+    # 4. High Speed Sparkle (Strobe)
+    panic_mode = compositor.add_layer(lambda layer: Sparkle(layer, speed=0.01, color=WHITE, num_sparkles=20))
+
+    # --- MASTER SEQUENCE ---
+    return CrossfadeSequence(
+        compositor,
+        liquid_ooze,        # 5 seconds of smooth purple/teal plasma
+        collision_event,    # 5 seconds of Red/Blue comets hitting each other
+        matrix_glitch,      # 5 seconds of digital rain/corruption
+        liquid_fire,        # 5 seconds of molten gold/red plasma
+        panic_mode,         # 5 seconds of intense white strobe
+        advance_interval=5,
+        crossfade=CROSSFADE_SECONDS,
+        auto_clear=True,
+    )
+
+
+def run_out_of_process():
+    """Run the sequence in a render process; an output process owns the strip."""
+    import time
+    from frame_ring import OutOfProcessRenderer
+
+    size = sum(n for _, n in STRIP_OUTPUTS) if STRIP_OUTPUTS else NUM_PIXELS
+    renderer = OutOfProcessRenderer(open_pixels, build_sequence, size, byteorder="BGR",
+                                    fps=FRAME_RATE)
+    print("Starting EXTREME Animation Sequence in worker processes...")
+    print("Press Ctrl+C to stop.")
+    renderer.start()
+    try:
+        while True:
+            time.sleep(STATS_INTERVAL or 1.0)
+            if STATS_INTERVAL:
+                print(renderer.report())
+    except KeyboardInterrupt:
+        print("\nStopping...")
+    finally:
+        renderer.stop()  # The output process clears the strip
+        print(renderer.report())
+
+
+def main():
+    if RENDER_PROCESS:
+        run_out_of_process()
+        return
+    from frame_scheduler import FrameScheduler
+    from frame_stats import FrameStats
+
+    frame_stats = FrameStats() if STATS_INTERVAL > 0 else None
+    pixels = open_pixels(frame_stats)
+    bake_cache = None
+    if BAKE_EFFECTS:
+        from bake_cache import BakeCache
+
+        bake_cache = BakeCache()  # One cache for every baked effect, so none evicts another's
+    animations = build_sequence(pixels, bake_cache)
+
+    print("Starting EXTREME Animation Sequence...")
+    print("Press Ctrl+C to stop.")
+
+    # Sleep between frames on fixed deadlines instead of spinning on animate()
+    scheduler = FrameScheduler(animations, fps=FRAME_RATE, policy="drop", frame_stats=frame_stats,
+                               stats_interval=STATS_INTERVAL if frame_stats else None)
+
+    try:
+        # Light the first frame here so startup can be timed to it
         animations.animate()
-except KeyboardInterrupt:
-    print("\nStopping...")
-finally:
-    pixels.fill(BLACK)
-    pixels.show()
\ No newline at end of file
+        startup.mark("first frame")
+        scheduler.run()
+    except KeyboardInterrupt:
+        print("\nStopping...")
+    finally:
+        pixels.fill(0)
+        pixels.show()
+        pixels.close()  # Waits for the cleared frame and finishes any recording
+        if bake_cache is not None:
+            bake_cache.close()  # Unmaps the baked frame files
+        print(f"Scheduler: {scheduler.report()}")
+        print(f"Frames sent: {pixels.frames_sent}, duplicates skipped: {pixels.frames_skipped}, "
+              f"shows deferred: {pixels.shows_deferred}")
+        if ASYNC_TRANSMIT or STRIP_OUTPUTS:
+            print(f"Transmit thread: {pixels.transmit_stats()}")
+        if frame_stats is not None:
+            print(frame_stats.report(histograms=True))
+
+
+if __name__ == "__main__":
+    main()
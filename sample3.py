@@ -1,11 +1,19 @@
 import asyncio
 import threading
-import tkinter as tk
-from tkinter import ttk
-import pyaudio
-import queue
 import sys
-from google import genai
+import time
+import startup
+from startup import lazy_module
+
+# Imported on first use: the window paints with only tkinter loaded, and numpy,
+# PyAudio and genai load on the background loop while the session pre-warms.
+# Profile the cold start to the first paint with: python startup.py sample3.py
+tk = lazy_module("tkinter")
+ttk = lazy_module("tkinter.ttk")
+pyaudio = lazy_module("pyaudio")
+genai = lazy_module("google.genai")
+audio_pipeline = lazy_module("audio_pipeline")
+frame_stats = lazy_module("frame_stats")
 
 # --- Configuration ---
 # REPLACE THIS WITH YOUR ACTUAL API KEY
@@ -13,6 +21,17 @@ API_KEY = "YOUR_GEMINI_API_KEY"
 
 # The experimental model that supports the Live API
 MODEL_ID = "gemini-2.0-flash-exp"
+LIVE_CONFIG = {"response_modalities": ["AUDIO"]}
+
+# Connection: the session is opened in the background when the app starts,
+# so Start Chat doesn't wait for the handshake. A dropped session is reopened
+# straight away; failed connects are retried after RECONNECT_MIN_SECONDS,
+# doubling up to RECONNECT_MAX_SECONDS, giving up after RECONNECT_ATTEMPTS
+# failures in a row. Mic and speaker buffers carry over a reconnect.
+# Try it offline against a stand-in server with: python bench_reconnect.py
+RECONNECT_MIN_SECONDS = 0.25
+RECONNECT_MAX_SECONDS = 8.0
+RECONNECT_ATTEMPTS = 6
 
 # Audio settings (Gemini Live expects 16kHz input, 24kHz output)
 INPUT_RATE = 16000
@@ -20,6 +39,61 @@ OUTPUT_RATE = 24000
 CHANNELS = 1
 CHUNK_SIZE = 512
 
+# Bounded audio buffers: mic audio waiting for the network, and model audio
+# waiting for the speaker. Overflow policy is "drop-oldest" (bounded delay)
+# or "block" (backpressure on the writer).
+INPUT_BUFFER_SECONDS = 2.0
+INPUT_OVERFLOW = "drop-oldest"
+OUTPUT_BUFFER_SECONDS = 30.0
+OUTPUT_OVERFLOW = "block"
+# Speaker jitter buffer: playout delay with steady arrivals; it grows with
+# measured arrival jitter (and after underruns) up to PLAYOUT_MAX_DELAY_MS
+PLAYOUT_DELAY_MS = 60
+PLAYOUT_MAX_DELAY_MS = 300
+
+# Voice-activity gate: only send speech (plus pre-roll before it and hangover
+# after it) instead of every mic chunk. The hangover is the trailing silence
+# the server hears, so keep it long enough for its end-of-turn detection.
+# Try settings on a recording with: python audio_pipeline.py vad FILE.wav
+VAD_ENABLED = False
+VAD_MARGIN_DB = 12.0
+VAD_PREROLL_MS = 200
+VAD_HANGOVER_MS = 600
+
+# Uplink packetization: coalesce mic audio into packets of UPLINK_PACKET_MS,
+# never holding audio longer than UPLINK_MAX_DELAY_MS. 0 / 0 sends every
+# chunk as it arrives. Tune offline with: python bench_uplink.py
+UPLINK_PACKET_MS = 64
+UPLINK_MAX_DELAY_MS = 50
+
+# Audio-reactive LEDs on a Pi 5 strip, driven by the microphone (see audio_reactive.py)
+LED_REACTIVE = False
+LED_PIN = "D18"
+LED_PIXELS = 96
+# Mic chunk while the LEDs react: 512 samples alone would be 32 ms of delay,
+# past the 25 ms mic-to-photon budget; 128 samples is 8 ms
+LED_CHUNK_SIZE = 128
+# Render and transmit the LEDs in worker processes (see frame_ring.py), so
+# they don't share the GIL with the audio callbacks and the GUI
+LED_PROCESS = False
+
+# --- LED worker processes (LED_PROCESS); module level so they can be pickled ---
+def open_led_strip():
+    """Open the strip in the LED output process."""
+    import board
+    from pi5_pixelbuf import Pi5Pixelbuf
+
+    return Pi5Pixelbuf(getattr(board, LED_PIN), LED_PIXELS, auto_write=False, byteorder="BGR",
+                       brightness=0.6)
+
+
+def build_reactive_leds(pixels, feed):
+    """The audio-reactive animation, in the LED render process."""
+    from audio_reactive import RingReactive
+
+    return RingReactive(pixels, feed, rate=INPUT_RATE)
+
+
 class AudioHandler:
     """
     Handles microphone input and speaker output using PyAudio.
@@ -28,19 +102,40 @@ class AudioHandler:
         self.p = pyaudio.PyAudio()
         self.input_stream = None
         self.output_stream = None
-        self.input_queue = asyncio.Queue()
-        self.output_queue = queue.Queue()
+        self.input_ring = audio_pipeline.AudioRing.for_duration(
+            INPUT_BUFFER_SECONDS, INPUT_RATE, INPUT_OVERFLOW
+        )
+        self.input_ready = asyncio.Event() # Set from the PyAudio thread when mic audio arrives
+        self.playback = audio_pipeline.JitterBuffer(
+            audio_pipeline.AudioRing.for_duration(OUTPUT_BUFFER_SECONDS, OUTPUT_RATE, OUTPUT_OVERFLOW),
+            target_delay=PLAYOUT_DELAY_MS / 1000,
+            max_delay=PLAYOUT_MAX_DELAY_MS / 1000,
+            device_frames=CHUNK_SIZE,
+        )
+        self.gate = None
+        if VAD_ENABLED:
+            # End of speech is also the reference for the reply's time-to-first-audio
+            self.gate = audio_pipeline.VoiceGate(
+                self.input_ring.write, rate=INPUT_RATE, margin_db=VAD_MARGIN_DB,
+                preroll_ms=VAD_PREROLL_MS, hangover_ms=VAD_HANGOVER_MS,
+                on_speech_end=self.playback.mark_request,
+            )
         self.is_recording = False
         self.loop = None # Will be set by the async client
+        self.taps = [] # Extra consumers of raw mic chunks, called on the PyAudio thread
+        self.leds = None
 
     def start_audio_streams(self):
+        if LED_REACTIVE:
+            self._start_leds()
+
         # Input Stream (Microphone)
         self.input_stream = self.p.open(
             format=pyaudio.paInt16,
             channels=CHANNELS,
             rate=INPUT_RATE,
             input=True,
-            frames_per_buffer=CHUNK_SIZE,
+            frames_per_buffer=LED_CHUNK_SIZE if LED_REACTIVE else CHUNK_SIZE,
             stream_callback=self._input_callback
         )
         
@@ -57,34 +152,72 @@ class AudioHandler:
         # Start a dedicated thread for non-blocking audio playback
         threading.Thread(target=self._play_output_loop, daemon=True).start()
 
+    def _start_leds(self):
+        """Drive the LED strip from the mic; imported here so the chat runs without it."""
+        if LED_PROCESS:
+            from frame_ring import OutOfProcessRenderer
+
+            # Render twice per mic chunk; frames without new audio cost nothing
+            fps = 2 * INPUT_RATE / LED_CHUNK_SIZE
+            self.leds = OutOfProcessRenderer(open_led_strip, build_reactive_leds, LED_PIXELS,
+                                             byteorder="BGR", fps=fps,
+                                             audio_chunk_bytes=LED_CHUNK_SIZE * 2)
+            self.leds.start()
+            self.taps.append(self.leds.push_audio)
+            return
+        import board
+        from audio_reactive import ReactiveLeds
+
+        self.leds = ReactiveLeds.for_strip(getattr(board, LED_PIN), LED_PIXELS, rate=INPUT_RATE)
+        self.taps.append(self.leds.analyzer.push)
+        self.leds.start()
+
     def _input_callback(self, in_data, frame_count, time_info, status):
         """
         Callback from PyAudio when new audio data is available from the mic.
         """
+        for tap in self.taps:
+            tap(in_data)
         if self.is_recording and self.loop:
-            # Transfer data from the PyAudio thread to the asyncio loop safely
-            try:
-                self.loop.call_soon_threadsafe(self.input_queue.put_nowait, in_data)
-            except Exception:
-                pass # Event loop might be closing
+            # Copy into the ring here; only the wake-up crosses to the asyncio loop
+            if self.gate is None:
+                self.input_ring.write(in_data)
+            elif not self.gate.process(in_data):
+                return (None, pyaudio.paContinue) # Silence: nothing to send
+            if not self.input_ready.is_set():
+                try:
+                    self.loop.call_soon_threadsafe(self.input_ready.set)
+                except Exception:
+                    pass # Event loop might be closing
         return (None, pyaudio.paContinue)
 
     def _play_output_loop(self):
         """
-        Reads audio chunks from the output queue and writes them to the speaker stream.
+        Plays device-sized chunks from the jitter buffer on the speaker stream.
         """
         while self.is_recording:
             try:
-                # Get data with a short timeout to allow checking is_recording
-                data = self.output_queue.get(timeout=0.1)
-                self.output_stream.write(data)
-            except queue.Empty:
-                continue
+                # Wait with a short timeout to allow checking is_recording
+                data = self.playback.read_chunk(timeout=0.1)
+                if data is not None:
+                    self.output_stream.write(data)
             except Exception as e:
                 print(f"Audio playback error: {e}")
 
     def stop_streams(self):
         self.is_recording = False
+        self.input_ring.close()
+        self.playback.ring.close()
+        print(f"Mic buffer: {self.input_ring.stats()}")
+        print(f"Speaker buffer: {self.playback.ring.stats()}")
+        print(f"Playback: {self.playback.stats()}")
+        if self.gate:
+            print(f"Voice gate: {self.gate.stats()}")
+        if self.leds:
+            self.taps.clear()
+            self.leds.stop()
+            print(self.leds.report())
+            self.leds = None
         if self.input_stream:
             self.input_stream.stop_stream()
             self.input_stream.close()
@@ -96,77 +229,194 @@ class AudioHandler:
 class GeminiLiveClient:
     """
     Manages the connection to the Gemini Live API.
+
+    prewarm() opens the session before the chat starts; run() starts the
+    audio and streams over whichever session is open, reconnecting if it
+    drops, until stop_event is set.
     """
-    def __init__(self, audio_handler, update_status_callback):
-        self.client = genai.Client(api_key=API_KEY, http_options={'api_version': 'v1alpha'})
+    def __init__(self, audio_handler, update_status_callback, client=None):
+        # Anything with genai.Client's aio.live.connect() will do, e.g. live_standin.StandInClient
+        self.client = client or genai.Client(api_key=API_KEY, http_options={'api_version': 'v1alpha'})
         self.audio = audio_handler
         self.update_status = update_status_callback
         self.stop_event = asyncio.Event()
+        self.active = asyncio.Event() # Set by run() once the audio is streaming
+        self.session_ready = asyncio.Event() # Set while a session is open
+        packet_seconds = (UPLINK_PACKET_MS or CHUNK_SIZE * 1000 / INPUT_RATE) / 1000
+        self.uplink = audio_pipeline.UplinkPacketizer.for_duration(
+            audio_handler.input_ring, audio_handler.input_ready, packet_seconds, UPLINK_MAX_DELAY_MS / 1000
+        )
+        self.connect_latency = frame_stats.RollingHistogram(64) # Successful connect handshakes
+        self.connect_failures = 0
+        self.reconnects = 0
+        self.start_wait = None # Seconds from run() until audio could be sent
+        self._started = None
+        self._session_task = None
+
+    def prewarm(self):
+        """Start opening the session in the background. Call from the event loop."""
+        if self._session_task is None or self._session_task.done():
+            self._session_task = asyncio.create_task(self._keep_session())
 
     async def run(self):
         # Capture the running event loop so the audio callback can use it
         self.audio.loop = asyncio.get_running_loop()
-        
+        self._started = time.perf_counter()
+        self.prewarm() # No-op if the session is already open or opening
+
         # Start Mic and Speaker
         self.audio.start_audio_streams()
-        self.update_status("Connected", "green")
-        
-        # Configure the session for Audio capabilities
-        config = {"response_modalities": ["AUDIO"]}
-        
-        try:
-            async with self.client.aio.live.connect(model=MODEL_ID, config=config) as session:
-                self.update_status("Listening...", "blue")
-                
-                # Run send and receive loops concurrently
-                send_task = asyncio.create_task(self.send_audio(session))
-                receive_task = asyncio.create_task(self.receive_audio(session))
-                
-                # Wait here until the stop button is pressed
-                await self.stop_event.wait()
-                
-                # Cleanup tasks
-                send_task.cancel()
-                receive_task.cancel()
+        self.active.set() # The session's _serve() reports "Listening..." once it is open
+        if not self.session_ready.is_set():
+            self.update_status("Connecting...", "orange")
 
-        except Exception as e:
-            print(f"Connection error: {e}")
-            self.update_status(f"Error: {str(e)[:30]}...", "red")
+        try:
+            # Wait here until the stop button is pressed (or reconnecting gives up)
+            await self.stop_event.wait()
         finally:
+            await self._end_session()
             self.audio.stop_streams()
+            print(f"Uplink: {self.uplink.stats()}")
+            print(f"Connection: {self.connection_stats()}")
 
-    async def send_audio(self, session):
-        """
-        Reads from input queue (mic) and sends to Gemini.
-        """
+    async def close(self):
+        """Close the session of a client that was pre-warmed but never run."""
+        await self._end_session()
+
+    async def _end_session(self):
+        self.stop_event.set()
+        if self._session_task is None:
+            return
+        if not self.session_ready.is_set():
+            self._session_task.cancel() # Don't sit out a handshake or backoff
+        await asyncio.gather(self._session_task, return_exceptions=True)
+
+    def _status(self, text, color):
+        """Status updates from the session; a pre-warmed session stays quiet until run()."""
+        if self.active.is_set():
+            self.update_status(text, color)
+
+    async def _keep_session(self):
+        """Hold a session open until stop_event, reconnecting when it drops."""
+        delay = RECONNECT_MIN_SECONDS
+        failures = 0
         while not self.stop_event.is_set():
+            started = time.perf_counter()
+            connected = None
             try:
-                audio_data = await self.audio.input_queue.get()
-                await session.send(input={"data": audio_data, "mime_type": "audio/pcm"}, end_of_turn=False)
-            except asyncio.CancelledError:
-                break
+                async with self.client.aio.live.connect(model=MODEL_ID, config=LIVE_CONFIG) as session:
+                    connected = time.perf_counter()
+                    self.connect_latency.add(connected - started)
+                    if self.connect_latency.count > 1:
+                        self.reconnects += 1
+                    self.session_ready.set()
+                    await self._serve(session)
             except Exception as e:
-                print(f"Send error: {e}")
+                print(f"Connection error: {e}")
+                error = e
+            finally:
+                self.session_ready.clear()
+            if self.stop_event.is_set():
                 break
+            # Play out what arrived of an interrupted reply instead of holding it back
+            self.audio.playback.end_turn()
+            if connected is not None and time.perf_counter() - connected > RECONNECT_MIN_SECONDS:
+                failures = 0
+                delay = RECONNECT_MIN_SECONDS
+                self._status("Reconnecting...", "orange")
+                continue
+
+            # Connect failed, or the session dropped as soon as it opened: back off
+            self.connect_failures += 1
+            failures += 1
+            if failures >= RECONNECT_ATTEMPTS:
+                self._status(f"Error: {str(error)[:30]}...", "red")
+                if self.active.is_set():
+                    self.stop_event.set()
+                return # run() tries again if the chat is started later
+            self._status(f"Reconnecting in {delay:.1f}s...", "orange")
+            try:
+                await asyncio.wait_for(self.stop_event.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+
+    async def _serve(self, session):
+        """
+        Runs the receive loop on a session, and the send loop once the chat has
+        started. Returns when stop_event is set; raises if either loop fails.
+        A pre-warmed session only receives, which still notices if it is dropped.
+        """
+        loops = [asyncio.create_task(self.receive_audio(session))]
+        stop = asyncio.create_task(self.stop_event.wait())
+        active = asyncio.create_task(self.active.wait())
+        pending = {loops[0], stop, active}
+        try:
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if stop in done:
+                    return
+                if active in done:
+                    done.discard(active)
+                    loops.append(asyncio.create_task(self.send_audio(session)))
+                    pending.add(loops[-1])
+                    if self.start_wait is None:
+                        self.start_wait = time.perf_counter() - self._started
+                    self.update_status("Listening...", "blue")
+                    if not done:
+                        continue
+                for task in done:
+                    task.result() # Raises the loop's error
+                if self.stop_event.is_set():
+                    return
+                raise ConnectionError("session closed")
+        finally:
+            for task in (*loops, stop, active):
+                task.cancel()
+            await asyncio.gather(*loops, stop, active, return_exceptions=True)
+
+    def connection_stats(self):
+        """Connect latency, failure and reconnect counts as a dict."""
+        t = self.connect_latency.summary()
+        return {
+            "connects": t["count"],
+            "connect_mean_ms": t["mean"],
+            "connect_max_ms": t["max"],
+            "connect_failures": self.connect_failures,
+            "reconnects": self.reconnects,
+            "start_wait_ms": None if self.start_wait is None else self.start_wait * 1000,
+        }
+
+    async def send_audio(self, session):
+        """
+        Reads packets of mic audio from the input ring and sends them to Gemini.
+        A packet that fails to send is kept by the uplink for the next session.
+        """
+        async def send(audio_data):
+            await session.send(input={"data": audio_data, "mime_type": "audio/pcm"}, end_of_turn=False)
+
+        await self.uplink.run(send)
+
+    async def queue_playback(self, data):
+        """Hand model audio to the jitter buffer, waiting off-loop if it is full."""
+        if not self.audio.playback.push(data, timeout=0):
+            await asyncio.to_thread(self.audio.playback.push, data)
 
     async def receive_audio(self, session):
         """
-        Receives audio chunks from Gemini and puts them in output queue (speaker).
+        Receives audio chunks from Gemini and puts them in the jitter buffer (speaker).
+        Errors propagate so the session can be reopened.
         """
         while not self.stop_event.is_set():
-            try:
-                async for response in session.receive():
-                    if response.server_content is not None:
-                        model_turn = response.server_content.model_turn
-                        if model_turn is not None:
-                            for part in model_turn.parts:
-                                if part.inline_data is not None:
-                                    self.audio.output_queue.put(part.inline_data.data)
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                print(f"Receive error: {e}")
-                break
+            async for response in session.receive():
+                if response.server_content is not None:
+                    model_turn = response.server_content.model_turn
+                    if model_turn is not None:
+                        for part in model_turn.parts:
+                            if part.inline_data is not None:
+                                await self.queue_playback(part.inline_data.data)
+                    if getattr(response.server_content, "turn_complete", False):
+                        self.audio.playback.end_turn()
 
 class ChatApp:
     """
@@ -202,10 +452,18 @@ class ChatApp:
         self.stop_btn = ttk.Button(self.btn_frame, text="End Chat", command=self.stop_chat, state=tk.DISABLED)
         self.stop_btn.pack(side=tk.LEFT, padx=10, ipadx=10, ipady=5)
 
-        # Asyncio Thread Handling
-        self.loop = None
-        self.thread = None
-        self.client = None
+        # Asyncio Thread Handling: one background loop for the app's lifetime,
+        # on which the next chat's client is created and its session pre-warmed
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.client = None # Client of the current (or last) chat
+        self._next_client = None # Future of the pre-warmed client for the next chat
+        self._chat_client = None # Future of the running chat's client, until it is stopped
+        self._chat_future = None
+        self._closing = False
+        # Pre-warm once the window is up, so the heavy imports don't delay its first paint
+        self.root.after_idle(self._on_first_paint)
 
         # Clean shutdown on window close
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
@@ -218,37 +476,75 @@ class ChatApp:
         self.status_label.config(text=text)
         self.status_indicator.itemconfig(self.status_indicator_circle, fill=color)
 
+    def _on_first_paint(self):
+        startup.mark("first paint")
+        self._prepare_client()
+
     def start_chat(self):
         self.start_btn.config(state=tk.DISABLED)
         self.stop_btn.config(state=tk.NORMAL)
         self.update_status("Connecting...", "orange")
-        
-        # Run asyncio in a separate thread so GUI doesn't freeze
-        self.thread = threading.Thread(target=self._run_async_loop, daemon=True)
-        self.thread.start()
+        if self._next_client is None:
+            self._prepare_client()
+        self._chat_client, self._next_client = self._next_client, None
+
+        # The chat runs on the background loop so the GUI doesn't freeze
+        self._chat_future = asyncio.run_coroutine_threadsafe(self._chat(self._chat_client), self.loop)
 
     def stop_chat(self):
-        if self.client:
-            # Signal the async loop to stop
-            self.loop.call_soon_threadsafe(self.client.stop_event.set)
-        
+        if self._chat_client is not None:
+            # Signal the async loop to stop, once the client exists if it is still being created
+            self._chat_client.add_done_callback(self._stop_client)
+            self._chat_client = None
+
         self.start_btn.config(state=tk.NORMAL)
         self.stop_btn.config(state=tk.DISABLED)
         self.update_status("Disconnected", "gray")
 
-    def _run_async_loop(self):
-        """Target function for the background thread."""
-        self.loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self.loop)
-        
-        audio_handler = AudioHandler()
-        self.client = GeminiLiveClient(audio_handler, self.update_status)
-        
-        self.loop.run_until_complete(self.client.run())
-        self.loop.close()
+    def _stop_client(self, future):
+        if not future.cancelled() and future.exception() is None:
+            self.loop.call_soon_threadsafe(future.result().stop_event.set)
+
+    def _prepare_client(self):
+        """Create the next chat's audio handler and client, and start opening its session."""
+        self._next_client = asyncio.run_coroutine_threadsafe(self._new_client(), self.loop)
+
+    async def _new_client(self):
+        client = GeminiLiveClient(AudioHandler(), self.update_status)
+        client.prewarm()
+        return client
+
+    async def _chat(self, pending):
+        """Run one chat on the pre-warmed client, then pre-warm the next."""
+        try:
+            self.client = await asyncio.wrap_future(pending)
+            if self.client.stop_event.is_set():
+                await self.client.close() # Stopped before it got going
+            else:
+                await self.client.run()
+        except Exception as e:
+            print(f"Chat error: {e}")
+            self.update_status(f"Error: {str(e)[:30]}...", "red")
+        finally:
+            if not self._closing and self._next_client is None:
+                self._prepare_client()
+
+    async def _close_clients(self):
+        """Wait for the current chat to finish and close the pre-warmed session."""
+        if self._chat_future:
+            await asyncio.gather(asyncio.wrap_future(self._chat_future), return_exceptions=True)
+        if self._next_client is None:
+            return # Closed before anything was pre-warmed
+        client = await asyncio.wrap_future(self._next_client)
+        await client.close()
 
     def on_close(self):
+        self._closing = True
         self.stop_chat()
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_clients(), self.loop).result(timeout=2)
+        except Exception:
+            pass # Exiting anyway
         self.root.destroy()
         sys.exit()
 
@@ -0,0 +1,172 @@
+"""Startup helpers: lazy imports, milestone marks and an import-time profile.
+
+``lazy_module(name)`` stands in for a module and imports it on first
+attribute access, so a script can name a heavy dependency at the top and
+only pay for it on the path that uses it:
+
+    genai = lazy_module("google.genai")   # imported when genai.Client is first used
+
+``mark(name)`` records a startup milestone such as the first lit frame or
+the first GUI paint. It does nothing unless ``STARTUP_PROFILE`` is set in
+the environment, in which case it prints the time since launch to stderr.
+
+Run as a script, this module profiles a script's cold start: it launches
+it under ``python -X importtime``, stops it at its first mark, and reports
+the time to that mark and the imports that happened before it:
+
+    python startup.py sample2.py
+    LED_BACKEND=null python startup.py --runs 5 --top 20 sample2.py
+"""
+import importlib
+import os
+import sys
+import time
+
+_LOADED_AT = time.time()
+MARK_PREFIX = "startup-mark:"
+
+
+class _LazyModule:
+    """Imports ``name`` on first attribute access, then serves its attributes."""
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._name)
+        value = getattr(module, attr)
+        # Cache on the proxy so later lookups skip __getattr__ entirely
+        self.__dict__[attr] = value
+        return value
+
+    def __repr__(self):
+        return f"<lazy module {self._name!r}>"
+
+
+def lazy_module(name):
+    """A stand-in for module ``name`` that imports it on first use.
+
+    A missing module raises ImportError at that first use, not here.
+    """
+    return _LazyModule(name)
+
+
+def mark(name):
+    """Print a startup milestone to stderr when STARTUP_PROFILE is set.
+
+    The time is measured from the launch timestamp the profiler puts in
+    STARTUP_PROFILE, or from when this module was imported if it holds
+    anything else (e.g. ``STARTUP_PROFILE=1`` by hand).
+    """
+    value = os.environ.get("STARTUP_PROFILE")
+    if not value:
+        return
+    try:
+        launched = float(value)
+    except ValueError:
+        launched = _LOADED_AT
+    print(f"{MARK_PREFIX} {name} {(time.time() - launched) * 1000:.1f}", file=sys.stderr, flush=True)
+
+
+# --- Import-time profile ---
+def _parse_importtime(line):
+    """(depth, module, self_us, cumulative_us) for a -X importtime line, else None."""
+    if not line.startswith("import time:"):
+        return None
+    fields = line[len("import time:") :].split("|")
+    if len(fields) != 3 or not fields[0].strip().isdigit():
+        return None  # the header line
+    name = fields[2].rstrip()
+    depth = (len(name) - len(name.lstrip()) - 1) // 2
+    return depth, name.strip(), int(fields[0]), int(fields[1])
+
+
+def profile_once(argv, timeout):
+    """Launch ``argv`` under -X importtime and stop it at its first mark.
+
+    Returns (mark name or None, ms to the mark or None, {top-level module:
+    (self_us, cumulative_us)} for imports before the mark).
+    """
+    # Imported here so scripts that only call mark() don't pay for them
+    import signal
+    import subprocess
+    import threading
+
+    env = dict(os.environ, STARTUP_PROFILE=repr(time.time()))
+    proc = subprocess.Popen([sys.executable, "-X", "importtime", *argv], env=env,
+                            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, text=True)
+    imports = {}
+    found = None
+    watchdog = threading.Timer(timeout, proc.kill)  # a script that never marks
+    watchdog.start()
+    try:
+        for line in proc.stderr:
+            if line.startswith(MARK_PREFIX):
+                name, _, ms = line[len(MARK_PREFIX) :].strip().rpartition(" ")
+                found = (name, float(ms))
+                break
+            entry = _parse_importtime(line)
+            if entry is not None and entry[0] == 0:
+                imports[entry[1]] = entry[2:]
+    finally:
+        watchdog.cancel()
+        # SIGINT first so the script's own cleanup (e.g. clearing the strip) runs
+        proc.send_signal(signal.SIGINT)
+        try:
+            proc.communicate(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+    if found is None:
+        return None, None, imports
+    return found[0], found[1], imports
+
+
+def profile(argv, runs=3, top=15, timeout=30.0):
+    """Profile ``runs`` cold starts of ``argv`` and return the report text."""
+    results = [profile_once(argv, timeout) for _ in range(runs)]
+    times = sorted(ms for _, ms, _ in results if ms is not None)
+    lines = []
+    if times:
+        name = next(name for name, ms, _ in results if ms is not None)
+        lines.append(f"{' '.join(argv)}: '{name}' at {times[len(times) // 2]:.1f} ms "
+                     f"(median of {len(times)}; min {times[0]:.1f}, max {times[-1]:.1f})")
+    else:
+        lines.append(f"{' '.join(argv)}: no startup mark within {timeout:.0f}s "
+                     "(does the script call startup.mark()?)")
+
+    # Median per module over the runs it appeared in
+    per_module = {}
+    for _, _, imports in results:
+        for module, timing in imports.items():
+            per_module.setdefault(module, []).append(timing)
+    medians = {
+        module: tuple(sorted(t[i] for t in timings)[len(timings) // 2] for i in (0, 1))
+        for module, timings in per_module.items()
+    }
+    total = sum(cumulative for _, cumulative in medians.values())
+    lines.append(f"Imports before the mark: {total / 1000:.1f} ms in {len(medians)} top-level modules")
+    lines.append(f"{'cumulative_ms':>13} {'self_ms':>8}  module")
+    ranked = sorted(medians.items(), key=lambda item: item[1][1], reverse=True)
+    for module, (self_us, cumulative_us) in ranked[:top]:
+        lines.append(f"{cumulative_us / 1000:>13.1f} {self_us / 1000:>8.1f}  {module}")
+    return "\n".join(lines)
+
+
+def _main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Time a script's cold start to its first startup.mark() and profile its imports")
+    parser.add_argument("--runs", type=int, default=3, help="cold starts to take the median of")
+    parser.add_argument("--top", type=int, default=15, help="imports to list")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for the mark")
+    parser.add_argument("script", help="script to run, e.g. sample2.py")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="arguments for the script")
+    args = parser.parse_args()
+    print(profile([args.script, *args.args], runs=args.runs, top=args.top, timeout=args.timeout))
+
+
+if __name__ == "__main__":
+    _main()